@@ -5,22 +5,38 @@ FastAPI 后端：封装 TableMerger + DataHealthScanner，提供 /merge-and-scan
 
 from __future__ import annotations
 
+import copy
+import functools
 import hashlib
 import json
 import re
 import sys
 import tempfile
+import threading
 import uuid
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 ROOT = Path(__file__).resolve().parent
 sys.path.insert(0, str(ROOT / "src"))
 
-from fastapi import FastAPI, File, Form, UploadFile, HTTPException, Request
+from fastapi import FastAPI, File, Form, UploadFile, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
-from core.merger import TableMerger, analyze_headers_with_strategy_from_contents
+try:
+    import orjson
+except ImportError:  # 未安装 orjson 时退回标准库 json
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401
+except ImportError:  # 未安装 pyarrow 时不提供 Arrow 输出，回退 JSON
+    pa = None
+
+from core.merger import TableMerger, analyze_headers_with_strategy_from_contents, df_to_merged_json
 from core.scanner import scan_health
 
 app = FastAPI(title="Merge & Health Scan API", version="1.0.0")
@@ -49,18 +65,94 @@ def check_status():
 # 当前处理文件的指纹（merge-and-scan 成功后更新），供 /api/check-status 对比
 _last_merge_fingerprint: str | None = None
 
-# analyze-headers 与 merge-and-scan 之间的内存缓存，避免文件对象被 GC 提前销毁
-_upload_cache: Dict[str, List[Tuple[str, bytes]]] = {}
+# analyze-headers 与 merge-and-scan 之间的上传缓存，避免文件对象被 GC 提前销毁。
+# 值为 (临时目录, [(filename, 落盘路径)], 指纹)：上传内容流式写入磁盘，缓存只持有路径，不持有整文件 bytes
+# LRU：新写入/访问的键移到末尾，淘汰时从头部弹出；
+# 与 _last_merge_fingerprint 的所有读写均由 _cache_lock 保护，临界区只做取值/赋值
+_upload_cache: "OrderedDict[str, Tuple[tempfile.TemporaryDirectory, List[Tuple[str, str]], str]]" = OrderedDict()
 _CACHE_MAX_ENTRIES = 20
+_cache_lock = threading.RLock()
+# 上传落盘时的分块大小，峰值内存与文件大小无关
+_UPLOAD_CHUNK_SIZE = 1 << 16
+
+
+def _json_bytes(content: Any) -> bytes:
+    """序列化为紧凑 UTF-8 JSON：优先 orjson（C 层实现），未安装时退回标准库 json。"""
+    if orjson is None:
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+class _FastJSONResponse(JSONResponse):
+    """合并结果等大体积响应：用 orjson 一次序列化，不经 FastAPI 的逐元素 jsonable_encoder。"""
+
+    def render(self, content: Any) -> bytes:
+        return _json_bytes(content)
+
+
+# NDJSON 流式响应每批转换/发送的行数
+_NDJSON_BATCH_ROWS = 1000
+
+
+def _iter_merge_scan_ndjson(payload: Dict[str, Any], df) -> Iterator[bytes]:
+    """
+    NDJSON 流：首行结构与 JSON 响应相同（merged.rows 为空），其后每行一条合并记录。
+    按批转换、逐批发送，不在内存中拼出整份响应，客户端可边收边渲染。
+    """
+    yield _json_bytes(payload) + b"\n"
+    for start in range(0, len(df), _NDJSON_BATCH_ROWS):
+        rows = df_to_merged_json(df.iloc[start:start + _NDJSON_BATCH_ROWS])["rows"]
+        yield b"".join(_json_bytes(row) + b"\n" for row in rows)
 
 
-def df_to_merged_json(df):
-    """DataFrame 转前端 MergedData：columns + rows，NaN 为 null。"""
-    records = json.loads(df.to_json(orient="records", date_format="iso", force_ascii=False))
-    out = []
-    for row in records:
-        out.append({k: (None if v is None else str(v)) for k, v in row.items()})
-    return {"columns": list(df.columns), "rows": out}
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def _arrow_stream_bytes(payload: Dict[str, Any], df) -> bytes:
+    """
+    合并表编码为 Arrow IPC 流：各列为 utf8 字符串、空值为 null（与 JSON 的 str | null 一致）；
+    schema_report、health_manifest 等元数据（结构同 NDJSON 首行）以 JSON 写入 schema metadata 的 merge_scan 键。
+    """
+    mask = df.isna().to_numpy()
+    arrays = [
+        pa.array(df.iloc[:, j].astype(str).to_numpy(dtype=object), type=pa.string(), mask=mask[:, j])
+        for j in range(df.shape[1])
+    ]
+    table = pa.Table.from_arrays(
+        arrays,
+        names=[str(c) for c in df.columns],
+        metadata={b"merge_scan": _json_bytes(payload)},
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _merge_scan_response(
+    df,
+    schema_report: dict,
+    health_manifest: dict,
+    fingerprint: Optional[str],
+    response_format: str,
+):
+    """
+    组装 merge-and-scan 响应：默认一次性 JSON；ndjson 时流式返回；
+    arrow 时返回 Arrow IPC 流（需安装 pyarrow，否则回退 JSON）。
+    """
+    payload: Dict[str, Any] = {
+        "schema_report": schema_report,
+        "health_manifest": health_manifest,
+        "merged": {"columns": list(df.columns), "rows": []},
+        "fingerprint": fingerprint,
+    }
+    if response_format == "ndjson":
+        return StreamingResponse(_iter_merge_scan_ndjson(payload, df), media_type="application/x-ndjson")
+    if response_format == "arrow" and pa is not None:
+        return Response(_arrow_stream_bytes(payload, df), media_type=ARROW_STREAM_MEDIA_TYPE)
+    payload["merged"] = df_to_merged_json(df)
+    # 直接返回 Response，跳过 FastAPI 对整张合并表逐元素的 jsonable_encoder 转换
+    return _FastJSONResponse(payload)
 
 
 # 技能实验室：持久化存储路径（不带 /api 前缀）
@@ -175,8 +267,8 @@ def check_status():
     返回当前系统内存中记录的合并指纹。
     前端轮询对比：若与本地保存的指纹不一致，则提示「源文档已更新」并展示「同步更新」。
     """
-    global _last_merge_fingerprint
-    return {"fingerprint": _last_merge_fingerprint}
+    with _cache_lock:
+        return {"fingerprint": _last_merge_fingerprint}
 
 
 @app.get("/health")
@@ -415,16 +507,31 @@ TEXT_NAME_KEYWORDS = ["名称", "名字", "标题", "说明", "备注", "描述"
 PROPORTION_KEYWORDS = ["比重", "比例", "率"]
 
 
+def _keyword_re(keywords: List[str], flags: int = 0) -> "re.Pattern[str]":
+    """将关键词列表编译为单个正则（alternation），一次 search 代替逐个关键词的 in 判断。"""
+    return re.compile("|".join(map(re.escape, keywords)), flags)
+
+
+_OUTLIER_RE = _keyword_re(OUTLIER_KEYWORDS)
+_DATE_RE = _keyword_re(DATE_KEYWORDS)
+_EMAIL_RE = _keyword_re(EMAIL_KEYWORDS, re.IGNORECASE)
+_NUMERIC_TYPE_RE = _keyword_re(NUMERIC_TYPE_KEYWORDS)
+_TEXT_NAME_RE = _keyword_re(TEXT_NAME_KEYWORDS)
+_PROPORTION_RE = _keyword_re(PROPORTION_KEYWORDS)
+
+# 日期/邮箱格式校验正则：模块加载时编译一次，以 re.Pattern 直接交给扫描器，不再每次扫描重新编译
+_DATE_PATTERN = re.compile(r"^\d{4}[-/]\d{1,2}[-/]\d{1,2}$")
+_EMAIL_PATTERN = re.compile(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
+
+
 def _is_text_name_column(col_name: str) -> bool:
     """判定是否为文本/名称类列，此类列不施加数值、日期、异常值规则。"""
-    c = col_name.strip()
-    return any(kw in c for kw in TEXT_NAME_KEYWORDS)
+    return _TEXT_NAME_RE.search(col_name) is not None
 
 
 def _is_proportion_column(col_name: str) -> bool:
     """判定是否为比重/比例类列，此类列只做类型校验，不做 IQR 异常值。"""
-    c = col_name.strip()
-    return any(kw in c for kw in PROPORTION_KEYWORDS)
+    return _PROPORTION_RE.search(col_name) is not None
 
 
 def _infer_rules_from_columns(base_columns: list) -> dict:
@@ -433,7 +540,15 @@ def _infer_rules_from_columns(base_columns: list) -> dict:
     加强字段类型分析：文本/名称列不施加数值/日期/异常值；比重列不做 IQR 异常值。
     返回：required_columns, numeric_columns, composite_key_columns,
           outlier_columns, pattern_columns, constraints, proposed_rules(前端展示用)。
+    同一批表头在 get-scan-rules、propose-rules、merge-and-scan 中会被重复推断，结果按列名元组缓存；
+    返回深拷贝，调用方修改不会污染缓存。
     """
+    return copy.deepcopy(_infer_rules_cached(tuple(base_columns)))
+
+
+@functools.lru_cache(maxsize=256)
+def _infer_rules_cached(base_columns: Tuple[str, ...]) -> dict:
+    """_infer_rules_from_columns 的缓存实现，结果不可直接交给调用方修改。"""
     base_set = set(base_columns)
     required_columns = list(base_columns)
     numeric_columns = [c for c in DEFAULT_NUMERIC_COLUMNS if c in base_set]
@@ -441,22 +556,27 @@ def _infer_rules_from_columns(base_columns: list) -> dict:
     outlier_columns = []
     pattern_columns = {}
     proposed_rules = []
+    # 与列表并行维护的集合，成员判断 O(1)，宽表时避免 O(列数²)
+    numeric_seen = set(numeric_columns)
+    outlier_seen: Set[str] = set()
 
+    # 关键词均不含空白，直接在原列名上 search 与先 strip 再判断等价；邮箱关键词忽略大小写
     for col in base_columns:
-        col_lower = col.lower().strip()
-        col_any = col.strip()
         if _is_text_name_column(col):
             continue
-        if any(kw in col_any for kw in OUTLIER_KEYWORDS):
-            if col not in numeric_columns:
+        if _OUTLIER_RE.search(col):
+            if col not in numeric_seen:
+                numeric_seen.add(col)
                 numeric_columns.append(col)
-            if not _is_proportion_column(col) and col not in outlier_columns:
+            if not _is_proportion_column(col) and col not in outlier_seen:
+                outlier_seen.add(col)
                 outlier_columns.append(col)
-        if any(kw in col_any for kw in NUMERIC_TYPE_KEYWORDS):
-            if col not in numeric_columns:
+        if _NUMERIC_TYPE_RE.search(col):
+            if col not in numeric_seen:
+                numeric_seen.add(col)
                 numeric_columns.append(col)
-        if any(kw in col_any for kw in DATE_KEYWORDS):
-            pattern_columns[col] = r"^\d{4}[-/]\d{1,2}[-/]\d{1,2}$"
+        if _DATE_RE.search(col):
+            pattern_columns[col] = _DATE_PATTERN
             proposed_rules.append({
                 "rule_type": "pattern",
                 "columns": [col],
@@ -464,8 +584,8 @@ def _infer_rules_from_columns(base_columns: list) -> dict:
                 "severity": "business",
                 "handling": "统一为 YYYY-MM-DD 或 YYYY/MM/DD，非日期（如待定、无记录）将标出",
             })
-        if any(kw in col_any or kw in col_lower for kw in EMAIL_KEYWORDS):
-            pattern_columns[col] = r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$"
+        if _EMAIL_RE.search(col):
+            pattern_columns[col] = _EMAIL_PATTERN
             proposed_rules.append({
                 "rule_type": "pattern",
                 "columns": [col],
@@ -531,20 +651,71 @@ async def propose_rules(body: dict):
     }
 
 
-def _evict_cache_if_needed() -> None:
-    """缓存条目过多时删除最旧的一条（FIFO 简单实现）。"""
-    global _upload_cache
-    if len(_upload_cache) < _CACHE_MAX_ENTRIES:
-        return
-    key_to_remove = next(iter(_upload_cache), None)
-    if key_to_remove is not None:
-        del _upload_cache[key_to_remove]
+def _cache_upload(cache_key: str, entry: Tuple[tempfile.TemporaryDirectory, List[Tuple[str, str]], str]) -> None:
+    """
+    写入上传缓存；条目超出上限时按 LRU 淘汰最久未使用的条目。
+    锁内只做字典的取值/赋值，被淘汰条目的临时目录在释放锁后再删除，删盘耗时不阻塞其他请求。
+    """
+    evicted: List[tempfile.TemporaryDirectory] = []
+    with _cache_lock:
+        _upload_cache[cache_key] = entry
+        _upload_cache.move_to_end(cache_key)
+        while len(_upload_cache) > _CACHE_MAX_ENTRIES:
+            _, (upload_dir, _, _) = _upload_cache.popitem(last=False)
+            evicted.append(upload_dir)
+    for upload_dir in evicted:
+        upload_dir.cleanup()
+
+
+def _spool_uploads(
+    files: List[UploadFile],
+    dest_dir: Path,
+    digests: Optional[List[bytes]] = None,
+) -> List[Tuple[str, str]]:
+    """
+    将上传文件按文件名排序后分块流式写入 dest_dir，返回 (filename, 路径)，不把整文件读入内存。
+    落盘文件名按序号生成，原始文件名只保留在返回的元组中：避免 "../" 等路径穿越，也避免同名上传互相覆盖。
+    传入 digests 时在写盘的同时逐文件计算 SHA256 摘要并按同一顺序追加，每个字节只经过一次。
+    """
+    entries: List[Tuple[str, str]] = []
+    # 复用同一块缓冲区 readinto，与 hashlib.file_digest 相同做法，避免每块分配新的 bytes
+    buf = memoryview(bytearray(_UPLOAD_CHUNK_SIZE))
+    for i, f in enumerate(sorted(files, key=lambda f: f.filename or "upload.csv")):
+        name = f.filename or "upload.csv"
+        # 零填充保证按落盘文件名排序时与上传顺序一致
+        path = dest_dir / f"{i:04d}{Path(name).suffix.lower()}"
+        h = hashlib.sha256()
+        with path.open("wb") as out:
+            while True:
+                n = f.file.readinto(buf)
+                if not n:
+                    break
+                out.write(buf[:n])
+                h.update(buf[:n])
+        if digests is not None:
+            digests.append(h.digest())
+        entries.append((name, str(path)))
+    return entries
+
+
+def _restore_upload_names(schema_report: dict, file_entries: List[Tuple[str, str]]) -> None:
+    """merger 报告中的文件名取自落盘路径（序号名），就地换回上传时的原始文件名。"""
+    names = {Path(p).name: name for name, p in file_entries}
+    if schema_report.get("reference_file") in names:
+        schema_report["reference_file"] = names[schema_report["reference_file"]]
+    for entry in schema_report.get("tables") or []:
+        entry["file"] = names.get(entry.get("file"), entry.get("file"))
+
+
+def _combine_digests(digests: List[bytes]) -> str:
+    """按文件名顺序拼接各文件摘要后再取 SHA256，作为整批上传的指纹。"""
+    return hashlib.sha256(b"".join(digests)).hexdigest()
 
 
 @app.post("/analyze-headers")
 async def api_analyze_headers(files: list[UploadFile] = File(..., description="多个 CSV 文件")):
     """
-    轻量级接口：从内存解析表头，并将文件内容写入内存缓存，供后续 merge-and-scan 使用，
+    轻量级接口：将上传文件流式写入缓存临时目录并解析表头，供后续 merge-and-scan 使用，
     避免文件对象被 Python GC 提前销毁（修复 FileNotFound）。
     返回格式适配前端 HeaderPreview：base_columns、files、preview、cache_key。
     """
@@ -552,37 +723,47 @@ async def api_analyze_headers(files: list[UploadFile] = File(..., description="
     if not csv_files:
         raise HTTPException(400, "请至少上传一个 CSV 文件")
 
-    file_entries: list[tuple[str, bytes]] = []
-    for f in csv_files:
-        content = await f.read()
-        name = f.filename or "upload.csv"
-        file_entries.append((name, content))
-    file_entries.sort(key=lambda x: x[0])
+    upload_dir = tempfile.TemporaryDirectory(prefix="upload_cache_")
+    # 写盘时顺带算好指纹并随缓存保存，merge-and-scan 命中缓存时无需再读一遍文件
+    digests: List[bytes] = []
+    file_entries = _spool_uploads(csv_files, Path(upload_dir.name), digests=digests)
+    fingerprint = _combine_digests(digests)
 
-    _evict_cache_if_needed()
+    # 表头分析完成后再放入缓存：入缓存后条目可能被并发请求淘汰并删除临时目录，不能再读其中的文件
+    try:
+        result = analyze_headers_with_strategy_from_contents(file_entries)
+    except BaseException:
+        upload_dir.cleanup()
+        raise
     cache_key = uuid.uuid4().hex
-    _upload_cache[cache_key] = file_entries
-
-    result = analyze_headers_with_strategy_from_contents(file_entries)
+    _cache_upload(cache_key, (upload_dir, file_entries, fingerprint))
     result["cache_key"] = cache_key
     return result
 
 
 @app.post("/merge-and-scan")
 async def merge_and_scan(
+    request: Request,
     files: list[UploadFile] = File(None, description="多个 CSV 文件；若传 cache_key 可省略"),
     merge_strategy: str = Form("template", description="intersection | union | template"),
     baseline_columns: str = Form(None, description="JSON 数组，策略为 intersection/union 时必传"),
     primary_key_columns: str = Form(None, description="JSON 数组，主键列用于去重"),
     template_incremental: str = Form("false", description="按模板时是否将多余列作为增量合并：true | false"),
     cache_key: str = Form(None, description="analyze-headers 返回的缓存键，优先使用缓存避免 GC 销毁"),
+    response_format: str = Query("json", alias="format", description="json | ndjson（首行为元数据，其后逐行返回合并记录）| arrow"),
 ):
-    """接收多个 CSV（或 cache_key）及可选策略/主键，调用 TableMerger.merge_and_report + DataHealthScanner.scan。"""
-    file_entries: list[tuple[str, bytes]] | None = None
-    if cache_key and cache_key.strip() and cache_key in _upload_cache:
-        file_entries = _upload_cache.pop(cache_key, None)
-
-    if file_entries is None or not file_entries:
+    """
+    接收多个 CSV（或 cache_key）及可选策略/主键，调用 TableMerger.merge_and_report + DataHealthScanner.scan。
+    请求头 Accept 含 application/vnd.apache.arrow.stream 时等同 format=arrow。
+    """
+    if ARROW_STREAM_MEDIA_TYPE in request.headers.get("accept", ""):
+        response_format = "arrow"
+    cached: tuple[tempfile.TemporaryDirectory, list[tuple[str, str]], str] | None = None
+    if cache_key and cache_key.strip():
+        with _cache_lock:
+            cached = _upload_cache.pop(cache_key, None)
+
+    if cached is None:
         csv_files = [f for f in (files or []) if f and f.filename and f.filename.lower().endswith(".csv")]
         if not csv_files:
             raise HTTPException(400, "请上传 CSV 文件或提供有效的 cache_key（先调用 analyze-headers）")
@@ -605,30 +786,16 @@ async def merge_and_scan(
         except (json.JSONDecodeError, TypeError):
             primary_key_list = None
 
-    if file_entries is not None:
-        file_entries_sorted = sorted(file_entries, key=lambda x: x[0])
-        file_contents = [c for _, c in file_entries_sorted]
+    if cached is not None:
+        upload_dir, file_entries, fingerprint = cached
     else:
-        file_entries_sorted = []
-        file_contents = []
-        for f in csv_files:
-            content = await f.read()
-            name = f.filename or "upload.csv"
-            file_entries_sorted.append((name, content))
-        file_entries_sorted.sort(key=lambda x: x[0])
-        file_contents = [c for _, c in file_entries_sorted]
-
-    with tempfile.TemporaryDirectory(prefix="merge_scan_") as tmpdir:
-        paths = []
-        for name, content in file_entries_sorted:
-            path = Path(tmpdir) / name
-            path.write_bytes(content)
-            paths.append(str(path))
-        paths.sort(key=lambda p: Path(p).name)
-        h = hashlib.sha256()
-        for content in file_contents:
-            h.update(content)
-        fingerprint = h.hexdigest()
+        upload_dir = tempfile.TemporaryDirectory(prefix="merge_scan_")
+        digests: List[bytes] = []
+        file_entries = _spool_uploads(csv_files, Path(upload_dir.name), digests=digests)
+        fingerprint = _combine_digests(digests)
+
+    with upload_dir:
+        paths = [p for _, p in file_entries]
         incremental = template_incremental.strip().lower() in ("true", "1", "yes")
         merger = TableMerger()
         df, schema_report = merger.merge_and_report(
@@ -637,18 +804,15 @@ async def merge_and_scan(
             template_incremental=incremental,
             primary_key_columns=primary_key_list,
         )
+        _restore_upload_names(schema_report, file_entries)
 
         if "error" in schema_report and schema_report.get("merged_row_count", 0) == 0:
-            return {
-                "schema_report": schema_report,
-                "health_manifest": {
-                    "errors": [],
-                    "summary": "合并未产生数据",
-                    "counts": {"structural_nulls": 0, "business_nulls": 0, "type_errors": 0, "duplicates": 0, "outliers": 0, "pattern_mismatch": 0, "constraint_violation": 0, "total": 0},
-                },
-                "merged": {"columns": [], "rows": []},
-                "fingerprint": None,
+            empty_manifest = {
+                "errors": [],
+                "summary": "合并未产生数据",
+                "counts": {"structural_nulls": 0, "business_nulls": 0, "type_errors": 0, "duplicates": 0, "outliers": 0, "pattern_mismatch": 0, "constraint_violation": 0, "total": 0},
             }
+            return _merge_scan_response(df, schema_report, empty_manifest, None, response_format)
 
         ref_cols = schema_report.get("reference_columns") or list(df.columns)
         inferred = _infer_rules_from_columns(ref_cols)
@@ -662,17 +826,12 @@ async def merge_and_scan(
             pattern_columns=inferred["pattern_columns"],
             constraints=inferred["constraints"],
         )
-        merged = df_to_merged_json(df)
 
         global _last_merge_fingerprint
-        _last_merge_fingerprint = fingerprint
+        with _cache_lock:
+            _last_merge_fingerprint = fingerprint
 
-        return {
-            "schema_report": schema_report,
-            "health_manifest": health_manifest,
-            "merged": merged,
-            "fingerprint": fingerprint,
-        }
+        return _merge_scan_response(df, schema_report, health_manifest, fingerprint, response_format)
 
 
 if __name__ == "__main__":
@@ -681,7 +840,10 @@ if __name__ == "__main__":
 
     port = 5001
     try:
-        uvicorn.run(app, host="0.0.0.0", port=port)
+        # 上传缓存（cache_key）与合并指纹保存在进程内存中，必须单进程运行，analyze-headers 与 merge-and-scan 才能共享
+        # loop/http 显式指定 auto：安装 uvicorn[standard] 时使用 uvloop 事件循环与 httptools（C 实现的 HTTP 解析），
+        # 未安装时（如 Windows 上无 uvloop）自动回退 asyncio/h11
+        uvicorn.run(app, host="0.0.0.0", port=port, loop="auto", http="auto")
     except OSError as e:
         if e.errno == errno.EADDRINUSE:
             print(f"\n端口 {port} 已被占用。可先杀掉旧进程：")
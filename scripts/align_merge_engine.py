@@ -7,24 +7,99 @@ Stage 1: 对齐合并引擎基础
 
 from __future__ import annotations
 
+import csv
 import json
+import mmap
+import re
 from pathlib import Path
 from typing import List, Tuple
 
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # 未安装 pyarrow 时退回 pandas C 引擎
+    pa = None
+    pacsv = None
+
 
 # 支持的表格式
 CSV_EXTENSIONS = {".csv"}
 EXCEL_EXTENSIONS = {".xlsx", ".xls"}
 
+# pandas 2.x 的 concat 默认 copy=True，显式 copy=False 在可行时复用输入块（如仅一张表）而不再复制；
+# pandas 3 起默认 Copy-on-Write，copy 参数已弃用，不再传入
+_PANDAS_LT_3 = int(pd.__version__.split(".")[0]) < 3
+_CONCAT_KWARGS = {"copy": False} if _PANDAS_LT_3 else {}
+
+# 与 pandas read_csv 默认 na_values 一致，保证两种读取器识别出的空值相同
+_CSV_NULL_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+
+# pandas 跳过仅含空格/制表符的行，并把不跟 \n 的单独 \r 视为换行；pyarrow 会把前者读成数据行
+_CSV_PANDAS_ONLY = re.compile(rb"(?:\A|\n)[ \t]+(?:[\r\n]|\Z)|\r(?!\n)")
+
+
+def _csv_pandas_only(path: Path) -> bool:
+    """文件中是否有只能按 pandas 规则解析的行（仅空白的行、末尾空白、单独 \r）；以只读 mmap 扫描，不整文件读入内存。"""
+    with open(path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            return False  # 空文件无法 mmap
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[-1:] in (b" ", b"\t") or _CSV_PANDAS_ONLY.search(mm) is not None
+
+
+def _read_csv_with_arrow(path: Path) -> pd.DataFrame | None:
+    """
+    pyarrow C++ 列式读取 CSV（连续字符串缓冲 + 偏移量，不为每个单元格分配 Python str），
+    各列显式声明为 string，避免类型推断吃掉前导零。
+    表头为空、含空列名或重名（pandas 会改写为 Unnamed/x.1），或含仅空白的行、单独 \r 时返回 None，由调用方走 pandas 保持结果一致。
+    """
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        header = next(csv.reader(f), [])
+    if not header or "" in header or len(set(header)) != len(header):
+        return None
+    if _csv_pandas_only(path):
+        return None
+    table = pacsv.read_csv(
+        path,
+        convert_options=pacsv.ConvertOptions(
+            column_types={c: pa.string() for c in header},
+            null_values=_CSV_NULL_VALUES,
+            strings_can_be_null=True,
+        ),
+    )
+    df = table.to_pandas()
+    if _PANDAS_LT_3:
+        # pandas 2 下 string 列转为 object，缺失值 None 换成 NaN，与 read_csv(dtype=str) 一致；
+        # 用 where 而非 fillna：fillna 会把全空列推断为 float64
+        df = df.where(df.notna(), np.nan)
+    return df
+
+
+def _read_csv_as_str(path: Path) -> pd.DataFrame:
+    """所有列按字符串读入 CSV：优先 pyarrow，不适用或解析失败时回退 pandas read_csv(dtype=str)。"""
+    if pacsv is not None:
+        try:
+            df = _read_csv_with_arrow(path)
+        except (pa.ArrowInvalid, UnicodeDecodeError, csv.Error):
+            df = None
+        if df is not None:
+            return df
+    return pd.read_csv(path, encoding="utf-8-sig", dtype=str)
+
 
 def _read_table(path: str | Path) -> pd.DataFrame:
     """根据扩展名读取 CSV 或 Excel（第一个工作表）。"""
     path = Path(path).resolve()
     suffix = path.suffix.lower()
     if suffix in CSV_EXTENSIONS:
-        return pd.read_csv(path, encoding="utf-8-sig", dtype=str)
+        return _read_csv_as_str(path)
     if suffix in EXCEL_EXTENSIONS:
         return pd.read_excel(path, sheet_name=0, dtype=str)
     raise ValueError(f"不支持的文件格式: {suffix}")
@@ -134,6 +209,11 @@ class TableMerger:
             entry["extra_columns"] = extra
             report["tables"].append(entry)
 
+            # 列序已与基准一致时直接复用，免去 reindex 的整表复制
+            if actual_columns == baseline_columns:
+                merged_dfs.append(df)
+                continue
+
             # 按基准列序重排，缺列补 NaN；结果仅含基准列，无重复
             aligned = df.reindex(columns=baseline_columns)
             merged_dfs.append(aligned)
@@ -144,7 +224,7 @@ class TableMerger:
             self.schema_report = report
             return pd.DataFrame(), self.schema_report
 
-        result = pd.concat(merged_dfs, axis=0, ignore_index=True)
+        result = pd.concat(merged_dfs, axis=0, ignore_index=True, **_CONCAT_KWARGS)
         report["merged_row_count"] = len(result)
         self.schema_report = report
         return result, self.schema_report
@@ -11,7 +11,8 @@
 
 from __future__ import annotations
 
-from typing import List, Optional
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
 
 import pandas as pd
 
@@ -51,17 +52,13 @@ def _check_type_compatibility(
     兼容规则：同一列在各表中要么都是数值型，要么都是对象/字符串型；数值与对象混用视为不兼容。
     返回 None 表示兼容；否则返回错误描述字符串。
     """
+    # 每张表只访问一次 df.dtypes，汇总出 列名 -> 出现过的类型种类
+    kinds_by_col: Dict[str, Set[str]] = defaultdict(set)
+    for df in tables:
+        for col, dtype in df.dtypes.items():
+            kinds_by_col[col].add("numeric" if pd.api.types.is_numeric_dtype(dtype) else "object")
     for col in standard_columns:
-        kinds = set()
-        for i, df in enumerate(tables):
-            if col not in df.columns:
-                continue
-            dtype = df[col].dtype
-            if pd.api.types.is_numeric_dtype(dtype):
-                kinds.add("numeric")
-            else:
-                kinds.add("object")
-        if len(kinds) > 1:
+        if len(kinds_by_col.get(col, ())) > 1:
             return f"列「{col}」在不同表中类型不一致（同时存在数值型与对象型），请先统一类型后再合并。"
     return None
 
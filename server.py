@@ -5,7 +5,7 @@
 
 from __future__ import annotations
 
-import json
+import shutil
 import sys
 import tempfile
 from pathlib import Path
@@ -17,7 +17,7 @@ sys.path.insert(0, str(ROOT / "src"))
 from fastapi import FastAPI, File, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 
-from core.merger import TableMerger
+from core.merger import TableMerger, df_to_merged_json
 from core.scanner import scan_health
 
 app = FastAPI(title="Merge & Health Scan API")
@@ -31,17 +31,6 @@ app.add_middleware(
 )
 
 
-def df_to_merged_json(df):
-    """DataFrame 转前端 MergedData 格式：columns + rows，NaN 为 null。"""
-    import pandas as pd
-    records = json.loads(df.to_json(orient="records", date_format="iso", force_ascii=False))
-    # 确保值为 str | null
-    out = []
-    for row in records:
-        out.append({k: (None if v is None else str(v)) for k, v in row.items()})
-    return {"columns": list(df.columns), "rows": out}
-
-
 @app.post("/merge-and-scan")
 async def merge_and_scan(files: list[UploadFile] = File(..., description="多个 CSV 文件")):
     """接收多个 CSV，执行合并与健康扫描，返回 schema_report、health_manifest、merged。"""
@@ -53,8 +42,9 @@ async def merge_and_scan(files: list[UploadFile] = File(..., description="多个
         paths = []
         for f in csv_files:
             path = Path(tmpdir) / (f.filename or "upload.csv")
-            content = await f.read()
-            path.write_bytes(content)
+            # 分块流式写盘，不把整文件读入内存
+            with path.open("wb") as out:
+                shutil.copyfileobj(f.file, out, 1 << 16)
             paths.append(str(path))
 
         # 按文件名排序，保证顺序稳定（可选）
@@ -6,66 +6,425 @@ Stage 1: 对齐合并引擎
 
 from __future__ import annotations
 
+import csv
 import io
 import json
+import mmap
+import os
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Set, Tuple
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Set, Tuple, TypeVar, Union
 
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # 未安装 pyarrow 时退回 pandas C 引擎
+    pa = None
+    pacsv = None
+
+try:
+    import python_calamine  # noqa: F401
+
+    _EXCEL_ENGINE: Optional[str] = "calamine"
+except ImportError:  # 未安装 python-calamine 时使用 pandas 默认引擎（openpyxl / xlrd）
+    _EXCEL_ENGINE = None
+
 
 CSV_EXTENSIONS = {".csv"}
 EXCEL_EXTENSIONS = {".xlsx", ".xls"}
 
+# pandas 2.x 的 concat 默认 copy=True，显式 copy=False 在可行时复用输入块（如仅一张表）而不再复制；
+# pandas 3 起默认 Copy-on-Write，copy 参数已弃用，不再传入
+_PANDAS_LT_3 = int(pd.__version__.split(".")[0]) < 3
+_CONCAT_KWARGS = {"copy": False} if _PANDAS_LT_3 else {}
+
+# 内存中的文件内容：bytes，或上传流式落盘后的路径（避免大文件整体驻留内存）
+TableContent = Union[bytes, str, Path]
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+
+def _content_source(content: TableContent) -> Union[BinaryIO, str, Path]:
+    """bytes 包装为 BytesIO，路径原样交给 pandas 直接读取。"""
+    if isinstance(content, (bytes, bytearray)):
+        return io.BytesIO(content)
+    return content
+
+
+# 与 pandas read_csv 默认 na_values 一致，保证两种读取器识别出的空值相同
+_CSV_NULL_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+
+def _csv_header_row(content: TableContent) -> List[str]:
+    """用标准库 csv 读取首行原始列名（不做 pandas 的重名/空名改写）。"""
+    if isinstance(content, (bytes, bytearray)):
+        f = io.TextIOWrapper(io.BytesIO(content), encoding="utf-8-sig", newline="")
+    else:
+        f = open(content, encoding="utf-8-sig", newline="")
+    with f:
+        return next(csv.reader(f), [])
+
+
+def _arrow_to_pandas(table: "pa.Table") -> pd.DataFrame:
+    """
+    pandas 3 下 string 列转为默认的 str 类型（pyarrow 存储，缺失值为 NaN），与 read_csv(dtype=str) 一致；
+    pandas 2 下转为 object 列，缺失值 None 需换成 NaN，否则主键 astype(str) 会得到 "None" 而非 "nan"。
+    """
+    df = table.to_pandas()
+    if _PANDAS_LT_3:
+        # 用 where 而非 fillna：fillna 会把全空列推断为 float64，而 read_csv(dtype=str) 仍是 object
+        df = df.where(df.notna(), np.nan)
+    return df
+
+
+_ROW_COUNT_CHUNK_SIZE = 1 << 20
+# 仅含空格/制表符的行：pandas 按空行跳过，按换行计数与 pyarrow 读取都会保留。以字面量 \n 开头，正则引擎可快速跳过不匹配位置；
+# 首行另用 match 判断，末行由末尾空白检查覆盖
+_CSV_WHITESPACE_LINE = re.compile(rb"\n[ \t]+[\r\n]")
+_CSV_LEADING_WHITESPACE_LINE = re.compile(rb"[ \t]+[\r\n]")
+
+CsvBuffer = Union[bytes, bytearray, mmap.mmap]
+
+
+def _csv_chunks(buf: CsvBuffer) -> Iterator[Tuple[CsvBuffer, int]]:
+    """
+    逐块给出 (chunk, end)，只统计 chunk[:end] 内的字节。bytes 整块返回；
+    mmap 没有 count，按块切片，任意时刻只多占一块内存；多切 1 字节，跨块边界的 \r\n 也能计入。
+    """
+    if isinstance(buf, (bytes, bytearray)):
+        yield buf, len(buf)
+        return
+    for i in range(0, len(buf), _ROW_COUNT_CHUNK_SIZE):
+        yield buf[i : i + _ROW_COUNT_CHUNK_SIZE + 1], _ROW_COUNT_CHUNK_SIZE
+
+
+def _lone_cr_in_chunk(chunk: CsvBuffer, end: int) -> bool:
+    """chunk[:end] 内是否有不跟 \n 的单独 \r（pandas 视为换行）。"""
+    cr = chunk.count(b"\r", 0, end)
+    return bool(cr) and cr != chunk.count(b"\r\n", 0, end + 1)
+
+
+def _csv_has_whitespace_lines(buf: CsvBuffer) -> bool:
+    """是否含仅空格/制表符的行（含末尾空白）。"""
+    if buf[-1:] in (b" ", b"\t"):
+        return True
+    return bool(_CSV_LEADING_WHITESPACE_LINE.match(buf) or _CSV_WHITESPACE_LINE.search(buf))
+
+
+def _csv_pandas_only(buf: CsvBuffer) -> bool:
+    """含仅空白的行或单独 \r 时，只有 pandas 的解析规则（跳过空白行、\r 视为换行）能给出一致结果。"""
+    return _csv_has_whitespace_lines(buf) or any(_lone_cr_in_chunk(c, end) for c, end in _csv_chunks(buf))
+
+
+def _with_csv_buffer(content: TableContent, fn: Callable[[CsvBuffer], _R]) -> _R:
+    """以 bytes 或整文件只读 mmap 调用 fn；落盘路径不把整文件读入进程内存。"""
+    if isinstance(content, (bytes, bytearray)):
+        return fn(content)
+    with open(content, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return fn(b"")  # 空文件无法 mmap
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return fn(mm)
+
+
+def _read_csv_with_arrow(content: TableContent, nrows: Optional[int]) -> Optional[pd.DataFrame]:
+    """
+    pyarrow C++ 列式读取 CSV，各列显式声明为 string，避免类型推断吃掉前导零。
+    表头为空、含空列名或重名（pandas 会改写为 Unnamed/x.1），或含仅空白的行、单独 \r（pyarrow 会读成数据行）时
+    返回 None，由调用方走 pandas 保持结果一致。
+    """
+    header = _csv_header_row(content)
+    if not header or "" in header or len(set(header)) != len(header):
+        return None
+    if _with_csv_buffer(content, _csv_pandas_only):
+        return None
+    convert_options = pacsv.ConvertOptions(
+        column_types={c: pa.string() for c in header},
+        null_values=_CSV_NULL_VALUES,
+        strings_can_be_null=True,
+    )
+    if nrows is None:
+        return _arrow_to_pandas(pacsv.read_csv(_content_source(content), convert_options=convert_options))
+    # 仅需前 nrows 行时按批流式读取，读够即停
+    reader = pacsv.open_csv(_content_source(content), convert_options=convert_options)
+    batches = []
+    remaining = nrows
+    while remaining > 0:
+        try:
+            batch = reader.read_next_batch()
+        except StopIteration:
+            break
+        batches.append(batch)
+        remaining -= batch.num_rows
+    return _arrow_to_pandas(pa.Table.from_batches(batches, schema=reader.schema).slice(0, nrows))
+
+
+def _read_csv_as_str(content: TableContent, nrows: Optional[int] = None) -> pd.DataFrame:
+    """所有列按字符串读入 CSV：优先 pyarrow（不为每个单元格分配 Python str），不适用或解析失败时回退 pandas。"""
+    if pacsv is not None:
+        try:
+            df = _read_csv_with_arrow(content, nrows)
+        except (pa.ArrowInvalid, UnicodeDecodeError, csv.Error):
+            df = None
+        if df is not None:
+            return df
+    return pd.read_csv(_content_source(content), encoding="utf-8-sig", dtype=str, nrows=nrows)
+
+
+def _table_suffix(name: str | Path) -> str:
+    """小写扩展名（含点，同 Path.suffix）。纯字符串运算，不构造 Path，也不 resolve() 解析真实路径。"""
+    return os.path.splitext(os.fspath(name))[1].lower()
+
+
+def _read_excel(content: TableContent, **kwargs) -> pd.DataFrame:
+    """
+    读取 Excel 第一个工作表。优先 calamine（Rust 实现，.xlsx/.xls 均可，远快于 openpyxl 的逐格解析）；
+    未安装、pandas 版本不支持或解析失败时回退默认引擎，坏文件的报错信息与原先一致。
+    """
+    if _EXCEL_ENGINE is not None:
+        try:
+            return pd.read_excel(_content_source(content), sheet_name=0, engine=_EXCEL_ENGINE, **kwargs)
+        except Exception:
+            pass
+    return pd.read_excel(_content_source(content), sheet_name=0, **kwargs)
+
 
 def _read_table(path: str | Path) -> pd.DataFrame:
     """根据扩展名读取 CSV 或 Excel（第一个工作表）。"""
-    path = Path(path).resolve()
-    suffix = path.suffix.lower()
+    suffix = _table_suffix(path)
     if suffix in CSV_EXTENSIONS:
-        return pd.read_csv(path, encoding="utf-8-sig", dtype=str)
+        return _read_csv_as_str(path)
     if suffix in EXCEL_EXTENSIONS:
-        return pd.read_excel(path, sheet_name=0, dtype=str)
+        return _read_excel(path, dtype=str)
     raise ValueError(f"不支持的文件格式: {suffix}")
 
 
+def _read_table_safely(path: str | Path) -> Tuple[Optional[pd.DataFrame], Optional[Exception]]:
+    """读取单表，异常作为返回值而非抛出，保证单个坏文件不影响整批读取。"""
+    try:
+        return _read_table(path), None
+    except Exception as e:
+        return None, e
+
+
+def _map_files_parallel(fn: Callable[[_T], _R], items: List[_T]) -> List[_R]:
+    """线程池对各文件并行执行 fn（读盘/解析时 C 层释放 GIL），结果保持输入顺序；单个文件时直接串行。"""
+    if len(items) <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(len(items), os.cpu_count() or 1)) as ex:
+        return list(ex.map(fn, items))
+
+
+def _read_tables_parallel(file_paths: List[str]) -> List[Tuple[Optional[pd.DataFrame], Optional[Exception]]]:
+    """并行读取多个表，结果保持输入顺序。"""
+    return _map_files_parallel(_read_table_safely, file_paths)
+
+
 def _read_header_columns(path: str | Path) -> List[str]:
     """仅读取表头列名，不读数据行。用于轻量级表头对比。"""
-    path = Path(path).resolve()
-    suffix = path.suffix.lower()
-    if suffix in CSV_EXTENSIONS:
-        df = pd.read_csv(path, encoding="utf-8-sig", nrows=0)
-        return list(df.columns)
-    if suffix in EXCEL_EXTENSIONS:
-        df = pd.read_excel(path, sheet_name=0, nrows=0)
-        return list(df.columns)
-    raise ValueError(f"不支持的文件格式: {suffix}")
+    return _read_header_columns_from_bytes(path, os.fspath(path))
+
+
+# CSV 表头探测只读取开头这么多字节，表头分析耗时与文件大小无关
+HEADER_PROBE_BYTES = 1 << 16
+
+
+def _csv_header_from_prefix(content: TableContent) -> Optional[List[str]]:
+    """
+    仅用 CSV 开头 HEADER_PROBE_BYTES 字节解析表头。
+    截断处落在引号字段或多字节字符中间导致解析失败、或探测范围内没有换行时返回 None，由调用方回退整文件解析。
+    """
+    if isinstance(content, (bytes, bytearray)):
+        head = bytes(content[: HEADER_PROBE_BYTES + 1])
+    else:
+        with open(content, "rb") as f:
+            head = f.read(HEADER_PROBE_BYTES + 1)
+    if len(head) <= HEADER_PROBE_BYTES:
+        return None  # 文件本身很小，直接整文件解析
+    head = head[:HEADER_PROBE_BYTES]
+    if b"\n" not in head:
+        return None
+    try:
+        return list(pd.read_csv(io.BytesIO(head), encoding="utf-8-sig", nrows=0).columns)
+    except Exception:
+        return None
+
+
+def _csv_header_fast(content: TableContent) -> Optional[List[str]]:
+    """
+    只取第一个换行前的字节按逗号切分表头，不构建 DataFrame。
+    首行含引号、为空或仅含空白（pandas 会跳过该行）、含单独 \r（pandas 视为换行）、有空列名或重名
+    （pandas 会改写为 Unnamed/x.1）时返回 None，交给 pandas 解析以保持列名一致。
+    """
+    if isinstance(content, (bytes, bytearray)):
+        nl = content.find(b"\n", 0, HEADER_PROBE_BYTES)
+        line = bytes(content[:nl]) if nl >= 0 else None
+    else:
+        with open(content, "rb") as f:
+            line = f.readline(HEADER_PROBE_BYTES)
+        line = line[:-1] if line.endswith(b"\n") else None
+    if not line or b'"' in line:
+        return None
+    try:
+        text = line.decode("utf-8-sig").rstrip("\r")
+    except UnicodeDecodeError:
+        return None
+    if text.strip() == "" or "\r" in text:
+        return None
+    names = text.split(",")
+    if "" in names or len(set(names)) != len(names):
+        return None
+    return names
+
+
+_XLSX_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+
+
+def _xml_local(tag: str) -> str:
+    """去掉命名空间前缀，兼容 transitional 与 strict 两种 OOXML 命名空间。"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _xml_text(elem: ET.Element) -> str:
+    """单元格 / 共享字符串的文本：拼接各 <t>（富文本分段），跳过拼音注音 <rPh>。"""
+    parts: List[str] = []
+    for child in elem:
+        name = _xml_local(child.tag)
+        if name == "t":
+            parts.append(child.text or "")
+        elif name == "r":
+            parts.extend(t.text or "" for t in child if _xml_local(t.tag) == "t")
+    return "".join(parts)
+
+
+def _xlsx_first_sheet_path(z: zipfile.ZipFile) -> str:
+    """按 workbook.xml 中第一个 <sheet> 及其关系定位工作表 XML（第一张表不一定是 sheet1.xml）。"""
+    workbook = ET.fromstring(z.read("xl/workbook.xml"))
+    sheet = next(e for e in workbook.iter() if _xml_local(e.tag) == "sheet")
+    rel_id = sheet.get(_XLSX_REL_NS) or next(v for k, v in sheet.attrib.items() if _xml_local(k) == "id")
+    rels = ET.fromstring(z.read("xl/_rels/workbook.xml.rels"))
+    target = next(e.get("Target") for e in rels if e.get("Id") == rel_id)
+    return target.lstrip("/") if target.startswith("/") else "xl/" + target
+
+
+def _xlsx_shared_strings(z: zipfile.ZipFile, upto: int) -> List[str]:
+    """流式解析共享字符串表，只解析到第 upto 条为止。"""
+    strings: List[str] = []
+    with z.open("xl/sharedStrings.xml") as f:
+        for _, elem in ET.iterparse(f):
+            if _xml_local(elem.tag) != "si":
+                continue
+            strings.append(_xml_text(elem))
+            elem.clear()
+            if len(strings) > upto:
+                break
+    return strings
+
+
+def _column_index(cell_ref: str) -> int:
+    """单元格引用（如 "C1"）的列序号，从 0 开始。"""
+    n = 0
+    for ch in cell_ref:
+        if not ch.isalpha():
+            break
+        n = n * 26 + (ord(ch.upper()) - 64)
+    return n - 1
 
 
-def _read_header_columns_from_bytes(content: bytes, filename: str = "") -> List[str]:
-    """从内存字节仅读取表头列名，不写磁盘，避免临时文件过早释放导致 FileNotFound。"""
-    suffix = Path(filename).suffix.lower() if filename else ".csv"
+def _xlsx_header_fast(content: TableContent) -> Optional[List[str]]:
+    """
+    直接读 xlsx 压缩包中的工作表 XML，流式解析到第一行结束即停止，不加载样式、不解析整张共享字符串表。
+    首行不是第 1 行、有空单元格/列间断、非字符串表头（pandas 会改写或转换类型）、含 _xHHHH_ 转义或重名时返回 None，交给 pandas。
+    """
+    source = io.BytesIO(content) if isinstance(content, (bytes, bytearray)) else content
+    with zipfile.ZipFile(source) as z:
+        cells: List[Tuple[str, str]] = []  # (类型, 原始值)：s 为共享字符串序号，其余为文本
+        with z.open(_xlsx_first_sheet_path(z)) as f:
+            for event, elem in ET.iterparse(f, events=("start", "end")):
+                name = _xml_local(elem.tag)
+                if event == "start":
+                    if name == "row" and elem.get("r", "1") != "1":
+                        return None
+                    continue
+                if name == "c":
+                    ref = elem.get("r")
+                    if ref is not None and _column_index(ref) != len(cells):
+                        return None
+                    kind = elem.get("t", "n")
+                    if kind == "inlineStr":
+                        inline = next((e for e in elem if _xml_local(e.tag) == "is"), None)
+                        value = _xml_text(inline) if inline is not None else None
+                    else:
+                        v = next((e for e in elem if _xml_local(e.tag) == "v"), None)
+                        value = v.text if v is not None else None
+                    if value is None or kind not in ("s", "str", "inlineStr"):
+                        return None
+                    cells.append((kind, value))
+                elif name == "row":
+                    break
+        if not cells:
+            return None
+        shared_refs = [int(v) for kind, v in cells if kind == "s"]
+        shared = _xlsx_shared_strings(z, max(shared_refs)) if shared_refs else []
+    names = [shared[int(v)] if kind == "s" else v for kind, v in cells]
+    if not all(names) or any("_x" in n for n in names) or len(set(names)) != len(names):
+        return None
+    return names
+
+
+def _read_header_columns_from_bytes(content: TableContent, filename: str = "") -> List[str]:
+    """从内存字节（或已落盘的上传路径）仅读取表头列名，避免临时文件过早释放导致 FileNotFound。"""
+    suffix = _table_suffix(filename) if filename else ".csv"
     if suffix in CSV_EXTENSIONS:
-        df = pd.read_csv(io.BytesIO(content), encoding="utf-8-sig", nrows=0)
+        headers = _csv_header_fast(content)
+        if headers is None:
+            headers = _csv_header_from_prefix(content)
+        if headers is not None:
+            return headers
+        df = pd.read_csv(_content_source(content), encoding="utf-8-sig", nrows=0)
         return list(df.columns)
     if suffix in EXCEL_EXTENSIONS:
-        df = pd.read_excel(io.BytesIO(content), sheet_name=0, nrows=0)
+        if suffix == ".xlsx":
+            try:
+                headers = _xlsx_header_fast(content)
+            except Exception:
+                headers = None
+            if headers is not None:
+                return headers
+        df = _read_excel(content, nrows=0)
         return list(df.columns)
     raise ValueError(f"不支持的文件格式: {suffix}")
 
 
-def _read_table_from_bytes(content: bytes, filename: str = "", nrows: Optional[int] = None) -> pd.DataFrame:
+def _read_table_from_bytes(content: TableContent, filename: str = "", nrows: Optional[int] = None) -> pd.DataFrame:
     """从内存字节读取 CSV/Excel（可选仅前 nrows 行），用于合并预览。"""
-    suffix = Path(filename).suffix.lower() if filename else ".csv"
+    suffix = _table_suffix(filename) if filename else ".csv"
     if suffix in CSV_EXTENSIONS:
-        df = pd.read_csv(io.BytesIO(content), encoding="utf-8-sig", dtype=str, nrows=nrows)
-        return df
+        return _read_csv_as_str(content, nrows=nrows)
     if suffix in EXCEL_EXTENSIONS:
-        df = pd.read_excel(io.BytesIO(content), sheet_name=0, dtype=str, nrows=nrows)
+        df = _read_excel(content, dtype=str, nrows=nrows)
         return df
     raise ValueError(f"不支持的文件格式: {suffix}")
 
 
+def _read_header_columns_safely(path: str | Path) -> Tuple[Optional[List[str]], Optional[Exception]]:
+    """读取单个文件表头，异常作为返回值，供线程池并行调用。"""
+    try:
+        return _read_header_columns(path), None
+    except Exception as e:
+        return None, e
+
+
 def analyze_headers_only(file_paths: List[str]) -> dict:
     """
     仅分析各文件表头差异，不进行实际合并。
@@ -79,24 +438,29 @@ def analyze_headers_only(file_paths: List[str]) -> dict:
     base_columns: List[str] = []
     file_entries: List[dict] = []
 
-    for fp in sorted(file_paths, key=lambda p: Path(p).name):
-        path = Path(fp)
-        name = path.name
+    sorted_paths = sorted(file_paths, key=lambda p: Path(p).name)
+    # 各文件表头读取相互独立（以读盘延迟为主），先并行读取，再按排序后的顺序串行比对
+    header_results = _map_files_parallel(_read_header_columns_safely, sorted_paths)
+
+    for fp, (headers, read_error) in zip(sorted_paths, header_results):
+        name = Path(fp).name
         entry = {"file": name, "missing_columns": [], "extra_columns": []}
-        try:
-            headers = _read_header_columns(path)
-        except Exception as e:
-            entry["error"] = str(e)
+        if read_error is not None:
+            entry["error"] = str(read_error)
             file_entries.append(entry)
             continue
 
         if baseline_columns is None:
             baseline_columns = headers
             base_columns = list(baseline_columns)
+            base_set = set(baseline_columns)
+            file_entries.append(entry)
+            continue
+        if headers == baseline_columns:
+            # 与基准表头完全相同（同一模板导出的常见情况），无缺失/多余列，免去构建集合与逐列比对
             file_entries.append(entry)
             continue
 
-        base_set = set(baseline_columns)
         actual_set = set(headers)
         entry["missing_columns"] = [c for c in baseline_columns if c not in actual_set]
         entry["extra_columns"] = [c for c in headers if c not in base_set]
@@ -105,26 +469,121 @@ def analyze_headers_only(file_paths: List[str]) -> dict:
     return {"base_columns": base_columns, "files": file_entries}
 
 
-def _row_count_from_content(content: bytes, filename: str = "") -> int:
-    """从内存字节快速估算行数（表头+数据行），用于合并效果小结。"""
-    suffix = Path(filename).suffix.lower() if filename else ".csv"
+
+
+def _count_csv_rows(buf: CsvBuffer) -> Optional[int]:
+    """
+    按换行符计数 CSV 数据行数（不含表头）。buf 为 bytes 或整文件 mmap，find/count 均为 C 层 memchr 扫描。
+    含引号（字段内可能换行，计数会偏多）、空行或仅含空白的行（pandas 会跳过）、末尾空白，
+    或出现不跟 \n 的单独 \r（pandas 视为换行）时返回 None，由调用方回退 pandas 解析。
+    """
+    if buf.find(b'"') >= 0 or buf.find(b"\n\n") >= 0 or buf.find(b"\n\r\n") >= 0:
+        return None
+    if buf[:1] == b"\n" or buf[:2] == b"\r\n":
+        return None  # 开头的空行
+    if _csv_has_whitespace_lines(buf):
+        return None
+    newlines = 0
+    # 计数与单独 \r 的检查共用同一遍分块扫描
+    for chunk, end in _csv_chunks(buf):
+        if _lone_cr_in_chunk(chunk, end):
+            return None
+        newlines += chunk.count(b"\n", 0, end)
+    lines = newlines if buf[-1:] in (b"\n", b"") else newlines + 1
+    return max(lines - 1, 0)
+
+
+def _csv_row_count_by_newlines(content: TableContent) -> Optional[int]:
+    """不构建 DataFrame 统计 CSV 数据行数；落盘路径以只读 mmap 映射，不把整文件读入进程内存。"""
+    return _with_csv_buffer(content, _count_csv_rows)
+
+
+def _excel_row_count(content: TableContent, suffix: str) -> Optional[int]:
+    """
+    读取工作表维度信息得到数据行数（不含表头），不逐格解析。
+    维度缺失，或维度末行没有任何值（如仅设置了格式的空行，read_excel 会丢弃），
+    或未安装对应的读取库（.xls 需 xlrd，而 _read_excel 可经 calamine 读取）时返回 None，由调用方回退整表解析。
+    """
+    try:
+        if suffix == ".xlsx":
+            import openpyxl
+        else:
+            import xlrd
+    except ImportError:
+        return None
+    if suffix == ".xlsx":
+        wb = openpyxl.load_workbook(_content_source(content), read_only=True, data_only=True)
+        try:
+            ws = wb.worksheets[0]
+            max_row = ws.max_row
+            if max_row is not None and max_row > 1:
+                last = next(ws.iter_rows(min_row=max_row, max_row=max_row, values_only=True), ())
+                if all(v is None or v == "" for v in last):
+                    return None
+        finally:
+            wb.close()
+    else:
+        if isinstance(content, (bytes, bytearray)):
+            book = xlrd.open_workbook(file_contents=bytes(content), on_demand=True)
+        else:
+            book = xlrd.open_workbook(str(content), on_demand=True)
+        try:
+            sheet = book.sheet_by_index(0)
+            max_row = sheet.nrows
+            if max_row > 1 and all(v == "" for v in sheet.row_values(max_row - 1)):
+                return None
+        finally:
+            book.release_resources()
+    if max_row is None:
+        return None
+    return max(max_row - 1, 0)
+
+
+def _row_count_from_content(content: TableContent, filename: str = "") -> int:
+    """
+    快速估算数据行数，用于合并效果小结。
+    CSV 直接数换行，Excel 读工作表维度；两者无法给出结果（或快速路径本身出错）时回退 pandas 整表解析，
+    只有整表也无法解析时才记为 0。
+    """
+    suffix = _table_suffix(filename) if filename else ".csv"
+    if suffix not in CSV_EXTENSIONS and suffix not in EXCEL_EXTENSIONS:
+        return 0
     try:
         if suffix in CSV_EXTENSIONS:
-            df = pd.read_csv(io.BytesIO(content), encoding="utf-8-sig", dtype=str)
-            return len(df)
-        if suffix in EXCEL_EXTENSIONS:
-            df = pd.read_excel(io.BytesIO(content), sheet_name=0, dtype=str)
-            return len(df)
+            count = _csv_row_count_by_newlines(content)
+        else:
+            count = _excel_row_count(content, suffix)
+    except Exception:
+        count = None  # 快速路径出错（如维度信息损坏）时交给整表解析判断
+    if count is not None:
+        return count
+    try:
+        if suffix in CSV_EXTENSIONS:
+            df = pd.read_csv(_content_source(content), encoding="utf-8-sig", dtype=str)
+        else:
+            df = _read_excel(content, dtype=str)
     except Exception:
-        pass
-    return 0
+        return 0  # 文件本身无法解析，读表错误由表头分析另行报告
+    return len(df)
+
+
+def _probe_content(
+    file_entry: Tuple[str, TableContent],
+) -> Tuple[Optional[List[str]], int, Optional[Exception]]:
+    """读取单个文件的表头与行数，异常作为返回值，供线程池并行调用。"""
+    name, content = file_entry
+    try:
+        return _read_header_columns_from_bytes(content, name), _row_count_from_content(content, name), None
+    except Exception as e:
+        return None, 0, e
 
 
 def analyze_headers_only_from_contents(
-    file_entries: List[Tuple[str, bytes]],
+    file_entries: List[Tuple[str, TableContent]],
 ) -> dict:
     """
-    从内存中的 (filename, content) 分析表头，不写磁盘，避免临时目录释放导致 FileNotFound。
+    从内存中的 (filename, content) 分析表头，避免临时目录释放导致 FileNotFound。
+    content 可为 bytes 或上传缓存的落盘路径。
     返回格式与 analyze_headers_only 一致；并为每个文件附加 row_count 供合并效果小结使用。
     """
     if not file_entries:
@@ -133,24 +592,28 @@ def analyze_headers_only_from_contents(
     baseline_columns: Optional[List[str]] = None
     base_columns: List[str] = []
     out_files: List[dict] = []
+    # 各文件的表头与行数相互独立，先并行探测，再按原顺序串行比对（首个成功文件为基准）
+    probes = _map_files_parallel(_probe_content, file_entries)
 
-    for name, content in file_entries:
+    for (name, _), (headers, row_count, error) in zip(file_entries, probes):
         entry = {"file": name, "missing_columns": [], "extra_columns": [], "row_count": 0}
-        try:
-            headers = _read_header_columns_from_bytes(content, name)
-            entry["row_count"] = _row_count_from_content(content, name)
-        except Exception as e:
-            entry["error"] = str(e)
+        if error is not None:
+            entry["error"] = str(error)
             out_files.append(entry)
             continue
+        entry["row_count"] = row_count
 
         if baseline_columns is None:
             baseline_columns = headers
             base_columns = list(baseline_columns)
+            base_set = set(baseline_columns)
+            out_files.append(entry)
+            continue
+        if headers == baseline_columns:
+            # 与基准表头完全相同（同一模板导出的常见情况），无缺失/多余列，免去构建集合与逐列比对
             out_files.append(entry)
             continue
 
-        base_set = set(baseline_columns)
         actual_set = set(headers)
         entry["missing_columns"] = [c for c in baseline_columns if c not in actual_set]
         entry["extra_columns"] = [c for c in headers if c not in base_set]
@@ -162,43 +625,58 @@ def analyze_headers_only_from_contents(
 PREVIEW_MAX_ROWS = 3
 
 
+def df_to_merged_json(df: pd.DataFrame) -> Dict[str, Any]:
+    """DataFrame 转前端 MergedData：columns + rows，NaN 为 null（整表向量化转 str，不经 JSON 往返）。"""
+    columns = list(df.columns)
+    if not columns:
+        # 无列时 isna 掩码为空的 float 数组，不能用作布尔下标
+        return {"columns": [], "rows": [{} for _ in range(len(df))]}
+    # copy=True：单列等情形下 to_numpy 可能返回只读视图，需拷贝后才能写入 None
+    values = df.astype(str).to_numpy(dtype=object, copy=True)
+    values[df.isna().to_numpy()] = None
+    return {"columns": columns, "rows": [dict(zip(columns, row)) for row in values.tolist()]}
+
+
 def build_merge_preview_from_contents(
-    file_entries: List[Tuple[str, bytes]],
+    file_entries: List[Tuple[str, TableContent]],
     extend_extra: bool = False,
     max_rows: int = PREVIEW_MAX_ROWS,
+    base: Optional[dict] = None,
 ) -> dict:
     """
     从内存中的 (filename, content) 生成合并缩略预览（基准左连接风格）。
     返回 { columns: [...], rows: [ {col: val}, ... ] }，供「确认对齐」前展示。
+    base 为调用方已算好的 analyze_headers_only_from_contents 结果，传入时不再重复解析表头与行数。
     """
-    base = analyze_headers_only_from_contents(file_entries)
+    if base is None:
+        base = analyze_headers_only_from_contents(file_entries)
     base_columns = base["base_columns"]
     files = base["files"]
     if not base_columns:
         return {"columns": [], "rows": []}
 
     if extend_extra:
-        all_cols: Set[str] = set(base_columns)
-        for ent in files:
-            if ent.get("error"):
-                continue
-            extra = set(ent.get("extra_columns") or [])
-            all_cols |= extra
-        cols = list(base_columns) + sorted(all_cols - set(base_columns))
+        # extra_columns 本就不含基准列，dict.fromkeys 一次去重即可；排序与合并时增量列的顺序保持一致
+        extras = dict.fromkeys(
+            c for ent in files if not ent.get("error") for c in (ent.get("extra_columns") or [])
+        )
+        cols = list(base_columns) + sorted(extras)
     else:
         cols = list(base_columns)
 
-    rows_out: List[dict] = []
-    for idx, (name, content) in enumerate(file_entries):
+    aligned_frames: List[pd.DataFrame] = []
+    for name, content in file_entries:
         try:
             df = _read_table_from_bytes(content, name, nrows=max_rows)
         except Exception:
             continue
-        aligned = df.reindex(columns=cols)
-        for _, row in aligned.iterrows():
-            rows_out.append({c: (None if pd.isna(row.get(c)) else str(row.get(c))) for c in cols})
+        aligned_frames.append(df.reindex(columns=cols))
+    if not aligned_frames:
+        return {"columns": cols, "rows": []}
 
-    return {"columns": cols, "rows": rows_out}
+    # 各文件预览行先拼成一张表，整表一次转字符串、一次 isna 得到空值掩码，避免逐文件、逐格判断
+    aligned = pd.concat(aligned_frames, ignore_index=True, **_CONCAT_KWARGS)
+    return df_to_merged_json(aligned)
 
 
 # 同义列候选：列名可能表示同一含义（用于策略透明化展示）
@@ -209,6 +687,7 @@ SYNONYM_PAIRS: List[List[str]] = [
 ]
 # 主键候选关键词（用于推断最佳主键）
 PRIMARY_KEY_KEYWORDS = ["姓名", "班级", "id", "编号", "学号", "代码"]
+_PK_RE = re.compile("|".join(map(re.escape, PRIMARY_KEY_KEYWORDS)))
 
 
 def _strategy_from_base(base: dict) -> dict:
@@ -227,34 +706,40 @@ def _strategy_from_base(base: dict) -> dict:
             "duplicate_column_groups": [],
         }
 
-    all_sets: List[Set[str]] = []
-    for i, ent in enumerate(files):
-        if ent.get("error"):
-            continue
-        if i == 0:
-            all_sets.append(set(base_columns))
-            continue
-        # 该文件实际列 = 基准列 - 缺失 + 多余
-        missing = set(ent.get("missing_columns") or [])
-        extra = set(ent.get("extra_columns") or [])
-        file_cols = (set(base_columns) - missing) | extra
-        all_sets.append(file_cols)
-
-    if not all_sets:
-        inter = set(base_columns)
+    uniform_headers = all(
+        not ent.get("missing_columns") and not ent.get("extra_columns") for ent in files if not ent.get("error")
+    )
+    if uniform_headers:
+        # 各表列与基准一致（同一模板导出的常见情况）：交集、并集即基准列，无需逐表构建集合
         union = set(base_columns)
+        columns_intersection = list(base_columns)
+        columns_union = list(base_columns)
     else:
-        inter = all_sets[0].copy()
-        for s in all_sets[1:]:
-            inter &= s
-        union = set()
-        for s in all_sets:
-            union |= s
-
-    columns_intersection = sorted(inter, key=lambda c: (base_columns.index(c) if c in base_columns else 999, c))
-    # 并集顺序：基准列优先，其余按出现顺序
-    extra_in_union = union - set(base_columns)
-    columns_union = list(base_columns) + sorted(extra_in_union)
+        all_sets: List[Set[str]] = []
+        for i, ent in enumerate(files):
+            if ent.get("error"):
+                continue
+            if i == 0:
+                all_sets.append(set(base_columns))
+                continue
+            # 该文件实际列 = 基准列 - 缺失 + 多余
+            missing = set(ent.get("missing_columns") or [])
+            extra = set(ent.get("extra_columns") or [])
+            file_cols = (set(base_columns) - missing) | extra
+            all_sets.append(file_cols)
+
+        if not all_sets:
+            inter = set(base_columns)
+            union = set(base_columns)
+        else:
+            # 从最小的集合开始求交，中间结果始终不超过最小集合；交、并各一次 C 层调用
+            inter = set.intersection(*sorted(all_sets, key=len))
+            union = set().union(*all_sets)
+
+        columns_intersection = sorted(inter, key=lambda c: (base_columns.index(c) if c in base_columns else 999, c))
+        # 并集顺序：基准列优先，其余按出现顺序
+        extra_in_union = union - set(base_columns)
+        columns_union = list(base_columns) + sorted(extra_in_union)
 
     synonym_candidates: List[List[str]] = []
     for pair in SYNONYM_PAIRS:
@@ -262,11 +747,11 @@ def _strategy_from_base(base: dict) -> dict:
         if len(in_union) >= 2:
             synonym_candidates.append(in_union)
 
-    suggested_primary_key: List[str] = []
-    for kw in PRIMARY_KEY_KEYWORDS:
-        for col in columns_intersection:
-            if kw in col and col not in suggested_primary_key:
-                suggested_primary_key.append(col)
+    # 先用一个正则筛出含任一关键词的列，再按命中的第一个关键词的次序稳定排序（同一关键词内保持列序）
+    suggested_primary_key: List[str] = sorted(
+        (col for col in columns_intersection if _PK_RE.search(col)),
+        key=lambda col: next(i for i, kw in enumerate(PRIMARY_KEY_KEYWORDS) if kw in col),
+    )
     if not suggested_primary_key and len(columns_intersection) >= 2:
         suggested_primary_key = columns_intersection[:2]
     elif not suggested_primary_key and columns_intersection:
@@ -298,7 +783,7 @@ def analyze_headers_with_strategy(file_paths: List[str]) -> dict:
 
 
 def analyze_headers_with_strategy_from_contents(
-    file_entries: List[Tuple[str, bytes]],
+    file_entries: List[Tuple[str, TableContent]],
     with_preview: bool = True,
     preview_extend_extra: bool = True,
 ) -> dict:
@@ -308,7 +793,7 @@ def analyze_headers_with_strategy_from_contents(
     if with_preview and base.get("base_columns") and file_entries:
         try:
             out["preview"] = build_merge_preview_from_contents(
-                file_entries, extend_extra=preview_extend_extra, max_rows=PREVIEW_MAX_ROWS
+                file_entries, extend_extra=preview_extend_extra, max_rows=PREVIEW_MAX_ROWS, base=base
             )
         except Exception:
             out["preview"] = {"columns": base["base_columns"], "rows": []}
@@ -318,13 +803,39 @@ def analyze_headers_with_strategy_from_contents(
 MATCH_RATE_WARN_THRESHOLD = 0.8
 
 
+def _align_columns(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """
+    按 columns 对齐列序，缺列补 NaN，等价于 df.reindex(columns=columns)。
+    已有列直接引用原列数据而不像 reindex 那样先复制整表，合并时只在最终 concat 复制一次。
+    """
+    present = set(df.columns)
+    data = {
+        c: df[c] if c in present else pd.Series(np.nan, index=df.index, dtype="float64")
+        for c in columns
+    }
+    return pd.DataFrame(data, index=df.index, columns=columns, copy=False)
+
+
+def _key_index(keys: pd.DataFrame) -> pd.Index:
+    """主键列转为 Index（单列）或 MultiIndex（多列），用于按主键查找。"""
+    if keys.shape[1] == 1:
+        return pd.Index(keys.iloc[:, 0])
+    return pd.MultiIndex.from_frame(keys)
+
+
 def _strip_primary_key_columns(df: pd.DataFrame, key_columns: List[str]) -> pd.DataFrame:
-    """对主键列执行 .str.strip()，剔除不可见字符。"""
-    out = df.copy()
+    """
+    对主键列执行 .str.strip()，剔除不可见字符。浅拷贝后只替换主键列，其余列不复制数据。
+    pyarrow 存储的字符串列（pandas 3 读 CSV 的默认类型）跳过 astype，直接走 Arrow 的 utf8_trim_whitespace 内核。
+    """
+    out = df.copy(deep=False)
     for col in key_columns:
         if col not in out.columns:
             continue
-        out[col] = out[col].astype(str).str.strip()
+        s = out[col]
+        if not (isinstance(s.dtype, pd.StringDtype) and s.dtype.storage == "pyarrow"):
+            s = s.astype(str)
+        out[col] = s.str.strip()
     return out
 
 
@@ -370,27 +881,25 @@ class TableMerger:
         fatal_count = 0
         cols_to_use: Optional[List[str]] = baseline_columns if baseline_columns else None
         key_cols: List[str] = list(primary_key_columns) if primary_key_columns else []
+        # 读盘+解析是主要耗时，先并行读完全部文件，后续对齐逻辑按原顺序串行处理
+        read_results = _read_tables_parallel(file_paths)
 
         if template_incremental:
             all_cols: Set[str] = set()
-            for fp in file_paths:
-                try:
-                    df = _read_table(fp)
+            for df, _ in read_results:
+                if df is not None:
                     all_cols |= set(df.columns)
-                except Exception:
-                    continue
             baseline_list: List[str] = list(cols_to_use) if cols_to_use else []
-            if not baseline_list and file_paths:
-                try:
-                    first_df = _read_table(file_paths[0])
-                    baseline_list = list(first_df.columns)
-                    all_cols |= set(baseline_list)
-                except Exception:
-                    pass
+            first_df = read_results[0][0]
+            if not baseline_list and first_df is not None:
+                baseline_list = list(first_df.columns)
+                all_cols |= set(baseline_list)
             base_set = set(baseline_list)
             extra_sorted = sorted(all_cols - base_set)
             cols_to_use = baseline_list + extra_sorted
 
+        # 基准列集合在基准确定后即固定，只构建一次供各表比对
+        baseline_set: Optional[Set[str]] = None
         for i, fp in enumerate(file_paths):
             path = Path(fp)
             name = path.name
@@ -402,11 +911,10 @@ class TableMerger:
                 "status": "ok",
                 "match_rate": None,
             }
-            try:
-                df = _read_table(fp)
-            except Exception as e:
+            df, read_error = read_results[i]
+            if read_error is not None:
                 entry["status"] = "read_error"
-                entry["error"] = str(e)
+                entry["error"] = str(read_error)
                 report["tables"].append(entry)
                 continue
 
@@ -426,17 +934,21 @@ class TableMerger:
                 if cols_to_use is None or len(cols_to_use) == 0:
                     cols_to_use = actual_columns
                 report["reference_columns"] = cols_to_use
+                baseline_set = set(cols_to_use)
                 # 左连接 + 增量列时：基准表只保留自身列，不扩展为 cols_to_use，否则 right_only 会为空，第二张表增量列无法带入
                 if key_cols and template_incremental:
-                    merged_dfs.append(df.copy())
+                    merged_dfs.append(df)
+                elif actual_columns == cols_to_use:
+                    merged_dfs.append(df)
                 else:
-                    merged_dfs.append(df.reindex(columns=cols_to_use))
+                    merged_dfs.append(_align_columns(df, cols_to_use))
                 entry["missing_columns"] = [c for c in cols_to_use if c not in actual_set]
-                entry["extra_columns"] = [c for c in actual_columns if c not in set(cols_to_use)]
+                entry["extra_columns"] = [c for c in actual_columns if c not in baseline_set]
                 report["tables"].append(entry)
                 continue
 
-            baseline_set = set(cols_to_use)
+            if baseline_set is None:
+                baseline_set = set(cols_to_use)
             missing = [c for c in cols_to_use if c not in actual_set]
             extra = [c for c in actual_columns if c not in baseline_set]
             intersection = actual_set & baseline_set
@@ -454,8 +966,11 @@ class TableMerger:
             entry["extra_columns"] = extra
             report["tables"].append(entry)
 
-            aligned = df.reindex(columns=cols_to_use)
-            merged_dfs.append(aligned)
+            # 列序已与基准一致（同一模板导出的常见情况）时直接复用，免去 reindex 的整表复制
+            if actual_columns == cols_to_use:
+                merged_dfs.append(df)
+                continue
+            merged_dfs.append(_align_columns(df, cols_to_use))
 
         report["fatal_mismatch_count"] = fatal_count
         if not merged_dfs:
@@ -466,36 +981,57 @@ class TableMerger:
         if key_cols and len(merged_dfs) > 0:
             key_cols_use = [c for c in key_cols if c in merged_dfs[0].columns]
             if key_cols_use:
-                left = merged_dfs[0].copy()
+                # 左连接不改变基准表的行与主键，各表的增量列可分别按基准主键对齐后一次性横向拼接，
+                # 免去每轮 merge 重新分配并复制整个结果表
+                left = merged_dfs[0]
+                left_cols: List[str] = list(left.columns)
+                joined_parts: List[pd.DataFrame] = []
+                # 基准主键按 merge_on 编码为整数（相当于分类编码的 codes），各表通常共用同一主键组合，编码只做一次；
+                # 之后每张表只需把自身主键映射到这套编码，对齐与匹配率都在整数数组上完成，不再重复哈希基准主键
+                baseline_keys: Dict[Tuple[str, ...], Tuple[np.ndarray, pd.Index]] = {}
+                total_left = len(left)
                 for idx in range(1, len(merged_dfs)):
                     right = merged_dfs[idx]
-                    merge_on = [c for c in key_cols_use if c in left.columns and c in right.columns]
+                    merge_on = [c for c in key_cols_use if c in left_cols and c in right.columns]
                     if not merge_on:
                         continue
-                    right_only = [c for c in right.columns if c not in left.columns]
-                    if right_only:
-                        right_merge = right[merge_on + right_only].copy()
-                    else:
-                        right_merge = right[merge_on].copy()
-                    right_merge = right_merge.drop_duplicates(subset=merge_on, keep="first")
-                    left = left.merge(right_merge, on=merge_on, how="left", suffixes=("", "_dup"))
-                    dup_cols = [c for c in left.columns if c.endswith("_dup")]
-                    left = left.drop(columns=dup_cols, errors="ignore")
-                    total_left = len(merged_dfs[0])
-                    right_keys = set(map(tuple, right[merge_on].drop_duplicates().values.tolist()))
-                    left_keys = set(map(tuple, merged_dfs[0][merge_on].values.tolist()))
-                    matched = len(left_keys & right_keys)
+                    cache_key = tuple(merge_on)
+                    if cache_key not in baseline_keys:
+                        # 缺失主键同样归为一类（get_indexer 中 NaN 可互相匹配），与 merge 的行为一致
+                        left_key_index = _key_index(left[merge_on])
+                        left_uniques = left_key_index.drop_duplicates()
+                        baseline_keys[cache_key] = (left_uniques.get_indexer(left_key_index), left_uniques)
+                    left_codes, left_uniques = baseline_keys[cache_key]
+                    right_only = [c for c in right.columns if c not in left_cols]
+                    right_merge = right[merge_on + right_only].drop_duplicates(subset=merge_on, keep="first")
+                    right_codes = left_uniques.get_indexer(_key_index(right_merge[merge_on]))
+                    hit = right_codes >= 0
+                    # 基准主键编码 -> 右表行号（-1 为无匹配），再按基准各行的编码取行
+                    row_of_code = np.full(len(left_uniques), -1, dtype=np.intp)
+                    row_of_code[right_codes[hit]] = np.flatnonzero(hit)
+                    part = right_merge[right_only].reset_index(drop=True).reindex(row_of_code[left_codes])
+                    part.index = left.index
+                    joined_parts.append(part)
+                    left_cols = [c for c in left_cols + right_only if not c.endswith("_dup")]
+                    # 右表主键已去重，命中的编码互不相同，命中数即两表共有的不同主键数；
+                    # 含缺失值的主键不计入匹配（如右表缺主键列、补空后全为 NaN），否则会掩盖低匹配率告警
+                    key_present = right_merge[merge_on].notna().all(axis=1).to_numpy()
+                    matched = int((hit & key_present).sum())
                     rate = matched / total_left if total_left else 1.0
                     if len(report["tables"]) > idx:
                         report["tables"][idx]["match_rate"] = round(rate, 4)
                     if rate < MATCH_RATE_WARN_THRESHOLD and report.get("merge_warning") is None:
                         report["merge_warning"] = "发现大量主键无法匹配，请检查是否存在同名异义或格式问题。"
-                # 左连接后按基准列顺序输出（cols_to_use），保证与 reference_columns 一致
+                # 左连接后按基准列顺序输出（cols_to_use），保证与 reference_columns 一致；
+                # 与逐轮 merge 相同，合并过程中以 _dup 结尾的列已被剔除
+                kept = set(left_cols)
+                parts = [left] + joined_parts
+                left = pd.concat([p[[c for c in p.columns if c in kept]] for p in parts], axis=1)
                 result = left.reindex(columns=report["reference_columns"])
             else:
-                result = pd.concat(merged_dfs, axis=0, ignore_index=True)
+                result = pd.concat(merged_dfs, axis=0, ignore_index=True, **_CONCAT_KWARGS)
         else:
-            result = pd.concat(merged_dfs, axis=0, ignore_index=True)
+            result = pd.concat(merged_dfs, axis=0, ignore_index=True, **_CONCAT_KWARGS)
 
         report["merged_row_count"] = len(result)
         self.schema_report = report
@@ -6,75 +6,68 @@
 
 from __future__ import annotations
 
+import os
 import re
-from typing import Any, Dict, List, Optional, Set, Tuple
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Pattern, Set, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow as pa
+except ImportError:  # 未安装 pyarrow 时 object 字符串列直接走 pandas 的 Python 字符串方法
+    pa = None
 
-def _row_index_to_file_index(row_index: int, schema_report: dict) -> int:
-    """根据行下标推断该行来自第几个文件（0-based）。"""
+
+def _row_file_indices(n_rows: int, schema_report: dict) -> np.ndarray:
+    """
+    一次性推断每一行来自第几个文件（0-based），返回长度为 n_rows 的数组。
+    对各表行数做累加后用 searchsorted 定位；超出各表行数之和的行归为第 0 个文件。
+    """
     tables = schema_report.get("tables") or []
-    cum = 0
-    for i, t in enumerate(tables):
-        n = t.get("row_count", 0)
-        if row_index < cum + n:
-            return i
-        cum += n
-    return 0
+    cum_rows = np.cumsum([t.get("row_count", 0) for t in tables], dtype=np.int64)
+    file_idx = np.searchsorted(cum_rows, np.arange(n_rows), side="right")
+    file_idx[file_idx >= len(tables)] = 0
+    return file_idx
 
 
-def _get_missing_columns_by_file(schema_report: dict) -> Dict[int, Set[str]]:
-    """返回 file_index -> set(missing_columns)。"""
+def _missing_column_table(schema_report: dict, columns: List[str]) -> np.ndarray:
+    """
+    返回 (文件数, 列数) 的布尔表：[file_index, j] 为 True 表示第 j 列在该源表中缺失（合并时补空）。
+    至少一行，没有 tables 时各行都归为第 0 个文件，按“不缺列”处理。
+    """
     tables = schema_report.get("tables") or []
-    out: Dict[int, Set[str]] = {}
+    col_pos = {c: j for j, c in enumerate(columns)}
+    table = np.zeros((max(len(tables), 1), len(columns)), dtype=bool)
     for i, t in enumerate(tables):
-        out[i] = set(t.get("missing_columns") or [])
-    return out
-
-
-def _is_empty(value: Any) -> bool:
-    """NaN 或空字符串视为空。"""
-    if pd.isna(value):
-        return True
-    s = str(value).strip()
-    return s == "" or s.lower() == "nan"
-
-
-def _is_numeric_value(value: Any) -> bool:
-    """是否可视为数值（用于类型检测）。支持纯数字与百分比（如 50%、50.5%）。"""
-    if pd.isna(value) or str(value).strip() == "":
-        return True
-    s = str(value).strip()
-    try:
-        float(s)
-        return True
-    except ValueError:
-        pass
-    if s.endswith("%"):
-        try:
-            float(s.rstrip("%").strip())
-            return True
-        except ValueError:
-            pass
-    return False
+        for c in t.get("missing_columns") or []:
+            j = col_pos.get(c)
+            if j is not None:
+                table[i, j] = True
+    return table
+
+
+def _is_text_column(series: pd.Series) -> bool:
+    """列内非缺失值是否全为 str（StringDtype，或只含字符串的 object 列）。"""
+    dtype = series.dtype
+    return isinstance(dtype, pd.StringDtype) or (
+        dtype == object and pd.api.types.infer_dtype(series, skipna=True) in ("string", "empty")
+    )
 
 
-def _to_float(value: Any) -> Optional[float]:
-    """转为 float，空或非法返回 None。支持百分比（如 50% 转为 50.0）。"""
-    if pd.isna(value) or str(value).strip() == "":
-        return None
-    s = str(value).strip()
-    try:
-        return float(s)
-    except ValueError:
-        pass
-    if s.endswith("%"):
-        try:
-            return float(s.rstrip("%").strip())
-        except ValueError:
-            pass
-    return None
+def _strip_text(series: pd.Series) -> pd.Series:
+    """
+    整列 str() 后去首尾空白。已是字符串的列直接走 .str，免去逐个单元格 str()；混合类型的 object 列仍需先 astype(str)。
+    object 字符串列先转为 Arrow 字符串，后续 strip / lower / isin / factorize 都走 Arrow C++ 内核。
+    """
+    if not _is_text_column(series):
+        return series.astype(str).str.strip()
+    if pa is not None and series.dtype == object:
+        series = series.astype("string[pyarrow]")
+    return series.str.strip()
 
 
 def _build_row_ranges(schema_report: dict) -> List[Tuple[int, int]]:
@@ -89,37 +82,207 @@ def _build_row_ranges(schema_report: dict) -> List[Tuple[int, int]]:
     return out
 
 
-def _outlier_bounds_iqr(series: pd.Series, k: float = 1.5) -> Tuple[Optional[float], Optional[float]]:
-    """IQR 法：返回 (lower, upper)，超出为异常值。空列返回 (None, None)。"""
-    numeric = series.apply(_to_float).dropna()
-    if len(numeric) < 4:
-        return (None, None)
-    q1 = numeric.quantile(0.25)
-    q3 = numeric.quantile(0.75)
-    iqr = q3 - q1
-    if iqr == 0:
-        return (float(q1), float(q3))
-    lower = float(q1 - k * iqr)
-    upper = float(q3 + k * iqr)
-    return (lower, upper)
-
-
-# 约束运算符：左列与右列比较
-def _eval_constraint(left_val: Optional[float], op: str, right_val: Optional[float]) -> bool:
-    """返回 True 表示约束满足。"""
-    if left_val is None or right_val is None:
-        return True
-    if op == ">":
-        return left_val > right_val
-    if op == "<":
-        return left_val < right_val
-    if op == ">=":
-        return left_val >= right_val
-    if op == "<=":
-        return left_val <= right_val
-    if op == "==":
-        return left_val == right_val
-    return True
+def _parse_numeric(text: pd.Series, na: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    整列解析数值，支持百分比（如 50% 转为 50.0）：text 为 _strip_text 的结果，na 为原列的 isna 掩码。
+    返回 (values, parsed)，parsed 为 True 处 values 为解析出的数值，其余为 NaN；空值与非法值 parsed 为 False。
+    按取值去重，百分号由 .str 整列去掉，再对每个不同取值调用一次 float()；不用 pd.to_numeric，
+    因其对指数写法的舍入与 float() 不同，且会接受 "2e 4" 这类 float() 拒绝的写法。
+    """
+    codes, uniques = pd.factorize(text)
+    candidates = pd.Series(np.asarray(uniques, dtype=object), dtype=object)
+    is_pct = candidates.str.endswith("%").to_numpy(dtype=bool)
+    candidates = candidates.where(~is_pct, candidates.str.rstrip("%").str.strip())
+    table = np.full(len(uniques) + 1, np.nan)  # 末位留给 codes == -1（缺失值）
+    ok = np.zeros(len(uniques) + 1, dtype=bool)
+    for k, candidate in enumerate(candidates.tolist()):
+        try:
+            table[k] = float(candidate)
+        except ValueError:
+            continue
+        ok[k] = True
+    return table[codes], ok[codes] & ~na
+
+
+def _match_pattern(text: pd.Series, pat: Pattern[str]) -> np.ndarray:
+    """
+    整列 pat.search 的布尔结果（缺失值为 False）。只对去重后的取值跑正则，再按 codes 展开：
+    日期、邮箱、班级这类重复度高的列，正则引擎的调用次数从行数降到不同取值数。
+    """
+    codes, uniques = pd.factorize(text)
+    # 先转 object 再走 .str：Arrow 字符串的 str.contains 用 RE2，\d 等语义与 re 不同
+    hits = pd.Series(np.asarray(uniques, dtype=object), dtype=object).str.contains(pat, regex=True, na=False)
+    return np.append(hits.to_numpy(dtype=bool), False)[codes]  # 末位对应 codes == -1（缺失值）
+
+
+class _ColumnContext:
+    """
+    单列在一次扫描中的共享中间结果：去空白文本、空值掩码、数值解析结果。
+    各步按需取用、每列只算一次，同一列不再被空值/类型/异常值/正则/约束各步重复遍历。
+    """
+
+    def __init__(self, series: pd.Series) -> None:
+        self.series = series
+        self.na = series.isna().to_numpy(dtype=bool)
+        self._text: Optional[pd.Series] = None
+        self._empty: Optional[np.ndarray] = None
+        self._numeric: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def text(self) -> pd.Series:
+        if self._text is None:
+            self._text = _strip_text(self.series)
+        return self._text
+
+    def empty(self) -> np.ndarray:
+        """空值掩码：NaN、空白字符串或 "nan"（不区分大小写）处为 True。"""
+        if self._empty is None:
+            if pd.api.types.is_numeric_dtype(self.series.dtype):
+                self._empty = self.na  # 非 NaN 的数值 str() 后不可能为空或 "nan"
+            else:
+                blank = self.text().str.lower().isin(["", "nan"]).to_numpy(dtype=bool)
+                self._empty = self.na | blank
+        return self._empty
+
+    def numeric(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._numeric is None:
+            self._numeric = _parse_numeric(self.text(), self.na)
+        return self._numeric
+
+
+# 单元格数不足该值时逐列串行准备，线程池调度开销不划算
+_PARALLEL_MIN_CELLS = 200_000
+
+
+def _prepare_columns(contexts: List[_ColumnContext], numeric_positions: Set[int], n_rows: int) -> None:
+    """
+    预先算好各列的空值掩码，以及 numeric_positions 中各列的数值解析结果。
+    Arrow 字符串内核与 factorize 在 C 层释放 GIL，大表按列交给线程池并行；每个线程只碰自己那一列的上下文。
+    """
+    def prepare(j: int) -> None:
+        ctx = contexts[j]
+        ctx.empty()
+        if j in numeric_positions:
+            ctx.numeric()
+
+    workers = min(len(contexts), os.cpu_count() or 1)
+    if workers <= 1 or n_rows * len(contexts) < _PARALLEL_MIN_CELLS:
+        for j in range(len(contexts)):
+            prepare(j)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        list(ex.map(prepare, range(len(contexts))))
+
+
+def _outlier_bounds_iqr(
+    columns: List[np.ndarray], k: float = 1.5
+) -> List[Tuple[Optional[float], Optional[float]]]:
+    """
+    IQR 法，多列一次算完：columns 为各列已解析的数值数组（NaN 忽略），按列返回 (lower, upper)，超出为异常值。
+    有效值不足 4 个的列返回 (None, None)。各列分位数由一次 np.nanpercentile(axis=0) 求出。
+    """
+    bounds: List[Tuple[Optional[float], Optional[float]]] = [(None, None)] * len(columns)
+    eligible = [i for i, values in enumerate(columns) if np.count_nonzero(~np.isnan(values)) >= 4]
+    if not eligible:
+        return bounds
+    q1s, q3s = np.nanpercentile(np.column_stack([columns[i] for i in eligible]), [25, 75], axis=0)
+    for i, q1, q3 in zip(eligible, q1s, q3s):
+        iqr = q3 - q1
+        if iqr == 0:
+            bounds[i] = (float(q1), float(q3))
+        else:
+            bounds[i] = (float(q1 - k * iqr), float(q3 + k * iqr))
+    return bounds
+
+
+@lru_cache(maxsize=256)
+def _compile_pattern(pattern: Union[str, Pattern[str]]) -> Optional[Pattern[str]]:
+    """编译正则并按 pattern 缓存；非法正则返回 None（该列跳过校验）。"""
+    try:
+        return re.compile(pattern)  # 已编译的 Pattern 原样返回
+    except re.error:
+        return None
+
+
+# 约束运算符：左列与右列逐元素比较，供整列向量化判定；未知运算符的约束跳过
+_CONSTRAINT_UFUNCS: Dict[str, Callable[[np.ndarray, np.ndarray], np.ndarray]] = {
+    ">": np.greater,
+    "<": np.less,
+    ">=": np.greater_equal,
+    "<=": np.less_equal,
+    "==": np.equal,
+}
+
+
+def _messages_by_value(values: np.ndarray, render: Callable[[Any], str]) -> List[str]:
+    """
+    按单元格原值生成提示文本。字符串值相同的只格式化一次并共用同一个 str 对象
+    （脏列里同一非法值往往大量重复）；其他类型不缓存，避免 1 / 1.0 / True 这类相等值共用文本。
+    """
+    cache: Dict[str, str] = {}
+    out: List[str] = []
+    for val in values:
+        if type(val) is str:
+            msg = cache.get(val)
+            if msg is None:
+                msg = cache[val] = render(val)
+        else:
+            msg = render(val)
+        out.append(msg)
+    return out
+
+
+class _ErrorColumns:
+    """
+    按列（SoA）累积扫描错误：各步批量追加行号、列名、类型、级别、提示，
+    扫描结束时再一次性组装为 errors 字典列表，不在每个命中单元格上单独建 dict。
+    """
+
+    def __init__(self) -> None:
+        self.rows: List[int] = []
+        self.col_names: List[str] = []
+        self.error_types: List[str] = []
+        self.severities: List[str] = []
+        self.messages: List[str] = []
+
+    def extend(
+        self,
+        rows: List[int],
+        col_names: List[str],
+        error_types: List[str],
+        severities: List[str],
+        messages: List[str],
+    ) -> None:
+        self.rows.extend(rows)
+        self.col_names.extend(col_names)
+        self.error_types.extend(error_types)
+        self.severities.extend(severities)
+        self.messages.extend(messages)
+
+    def add(
+        self,
+        rows: List[int],
+        col_name: str,
+        error_type: str,
+        severity: str,
+        message: Union[str, List[str]],
+    ) -> None:
+        """同一列、同一类错误批量追加；message 为 str 时各行共用。"""
+        n = len(rows)
+        if not n:
+            return
+        self.extend(
+            rows,
+            [col_name] * n,
+            [error_type] * n,
+            [severity] * n,
+            [message] * n if isinstance(message, str) else message,
+        )
+
+    def to_dicts(self) -> List[dict]:
+        return [
+            {"row_index": r, "col_name": c, "error_type": t, "severity": s, "message": m}
+            for r, c, t, s, m in zip(self.rows, self.col_names, self.error_types, self.severities, self.messages)
+        ]
 
 
 class DataHealthScanner:
@@ -133,20 +296,25 @@ class DataHealthScanner:
         composite_key_columns: Optional[List[str]] = None,
         numeric_columns: Optional[List[str]] = None,
         outlier_columns: Optional[List[str]] = None,
-        pattern_columns: Optional[Dict[str, str]] = None,
+        pattern_columns: Optional[Dict[str, Union[str, Pattern[str]]]] = None,
         constraints: Optional[List[Dict[str, Any]]] = None,
     ) -> None:
         """
         composite_key_columns: 组合主键，默认 ["姓名", "班级"]。
         numeric_columns: 数值列（类型+可选异常值），默认 ["分数"]。
         outlier_columns: 额外做异常值检测的列（可与 numeric_columns 重叠）。
-        pattern_columns: 列名 -> 正则 pattern，不匹配且非空则报错。
+        pattern_columns: 列名 -> 正则 pattern（字符串或已编译的 re.Pattern），不匹配且非空则报错。
         constraints: [{ "left": "A", "op": ">", "right": "B" }]，A列需大于B列等。
         """
         self.composite_key_columns = composite_key_columns or ["姓名", "班级"]
         self.numeric_columns = numeric_columns or ["分数"]
         self.outlier_columns = list(outlier_columns) if outlier_columns else []
         self.pattern_columns = dict(pattern_columns) if pattern_columns else {}
+        self._compiled_patterns: Dict[str, Pattern[str]] = {}
+        for col, pattern in self.pattern_columns.items():
+            pat = _compile_pattern(pattern)
+            if pat is not None:
+                self._compiled_patterns[col] = pat
         self.constraints = list(constraints) if constraints else []
 
     def scan(
@@ -158,141 +326,122 @@ class DataHealthScanner:
         执行完整健康扫描，返回 health_manifest。
         包含：空值、类型、重复、异常值(outlier)、正则(pattern_mismatch)、逻辑约束(constraint_violation)。
         """
-        errors: List[dict] = []
-        missing_by_file = _get_missing_columns_by_file(schema_report)
+        errs = _ErrorColumns()
+        # 每列只建一次上下文，各步共用其去空白文本、空值掩码与数值解析结果
+        columns = list(df.columns)
+        col_pos = {c: j for j, c in enumerate(columns)}
+        contexts = [_ColumnContext(df.iloc[:, j]) for j in range(len(columns))]
+        numeric_names = set(self.numeric_columns) | set(self.outlier_columns)
+        for c in self.constraints:
+            if c.get("op", ">") in _CONSTRAINT_UFUNCS:
+                numeric_names.update((c.get("left"), c.get("right")))
+        _prepare_columns(contexts, {col_pos[c] for c in numeric_names if c in col_pos}, len(df))
 
         # ---- 1. 空值定位 ----
-        for row_index in range(len(df)):
-            file_idx = _row_index_to_file_index(row_index, schema_report)
-            missing_cols = missing_by_file.get(file_idx, set())
-            for col in df.columns:
-                val = df.iloc[row_index][col]
-                if not _is_empty(val):
-                    continue
-                if col in missing_cols:
-                    errors.append({
-                        "row_index": int(row_index),
-                        "col_name": col,
-                        "error_type": "null_structural",
-                        "severity": "structural",
-                        "message": "合并时该列在源表中缺失，已补空",
-                    })
-                else:
-                    errors.append({
-                        "row_index": int(row_index),
-                        "col_name": col,
-                        "error_type": "null_business",
-                        "severity": "business",
-                        "message": "空值或空字符串",
-                    })
+        # 各列空值掩码拼成 (行, 列) 布尔矩阵；np.nonzero 按行优先返回命中位置，
+        # 与逐行逐列扫描的报错顺序一致，只对命中的单元格做 Python 层处理
+        if columns:
+            null_mask = np.column_stack([ctx.empty() for ctx in contexts])
+        else:
+            null_mask = np.zeros((len(df), 0), dtype=bool)
+        hit_rows, hit_cols = np.nonzero(null_mask)
+        # 缺列表按 (来源文件, 列) 一次取值，区分结构性空值与业务空值
+        missing_table = _missing_column_table(schema_report, columns)
+        row_file_idx = _row_file_indices(len(df), schema_report)
+        structural = missing_table[row_file_idx[hit_rows], hit_cols].tolist()
+        errs.extend(
+            hit_rows.tolist(),
+            [columns[j] for j in hit_cols.tolist()],
+            ["null_structural" if is_struct else "null_business" for is_struct in structural],
+            ["structural" if is_struct else "business" for is_struct in structural],
+            ["合并时该列在源表中缺失，已补空" if is_struct else "空值或空字符串" for is_struct in structural],
+        )
 
         # ---- 2. 类型不一致 ----
         for col in self.numeric_columns:
-            if col not in df.columns:
+            if col not in col_pos:
                 continue
-            for row_index in range(len(df)):
-                val = df.iloc[row_index][col]
-                if _is_empty(val):
-                    continue
-                if not _is_numeric_value(val):
-                    errors.append({
-                        "row_index": int(row_index),
-                        "col_name": col,
-                        "error_type": "type_inconsistent",
-                        "severity": "business",
-                        "message": f"期望数值，实际为: {str(val)[:50]}",
-                    })
+            ctx = contexts[col_pos[col]]
+            _, parsed = ctx.numeric()
+            bad_rows = np.flatnonzero(~ctx.empty() & ~parsed)
+            errs.add(
+                bad_rows.tolist(), col, "type_inconsistent", "business",
+                _messages_by_value(ctx.series.to_numpy()[bad_rows], lambda val: f"期望数值，实际为: {str(val)[:50]}"),
+            )
 
         # ---- 3. 重复项 ----
-        key_cols = [c for c in self.composite_key_columns if c in df.columns]
+        key_cols = [c for c in self.composite_key_columns if c in col_pos]
         if key_cols:
-            seen: Set[Tuple[str, ...]] = set()
-            for row_index in range(len(df)):
-                key = tuple(str(df.iloc[row_index][c]) if pd.notna(df.iloc[row_index][c]) else "" for c in key_cols)
-                if key in seen:
-                    errors.append({
-                        "row_index": int(row_index),
-                        "col_name": ",".join(key_cols),
-                        "error_type": "duplicate",
-                        "severity": "business",
-                        "message": f"与组合主键 {key_cols} 重复",
-                    })
-                else:
-                    seen.add(key)
+            # 键值取 str()，空值记为 ""；groupby().cumcount() 一次哈希给出每行是该键第几次出现，
+            # 首次出现（0）不报，其余均为重复
+            key_parts = {}
+            for k, c in enumerate(key_cols):
+                ser = contexts[col_pos[c]].series
+                key_parts[k] = ser.astype(str).where(ser.notna(), "")
+            key_frame = pd.DataFrame(key_parts)
+            occurrence = key_frame.groupby(list(key_frame.columns), sort=False).cumcount().to_numpy()
+            dup_rows = np.flatnonzero(occurrence > 0)
+            errs.add(dup_rows.tolist(), ",".join(key_cols), "duplicate", "business", f"与组合主键 {key_cols} 重复")
 
         # ---- 4. 异常值（IQR）----
-        all_outlier_cols = list(set(self.numeric_columns) | set(self.outlier_columns))
-        for col in all_outlier_cols:
-            if col not in df.columns:
-                continue
-            ser = df[col].apply(lambda v: _to_float(v))
-            lower, upper = _outlier_bounds_iqr(ser)
+        # dict.fromkeys 去重并保持声明顺序（先 numeric_columns 后 outlier_columns），报错顺序不随字符串哈希种子变化
+        all_outlier_cols = dict.fromkeys([*self.numeric_columns, *self.outlier_columns])
+        outlier_cols = [col for col in all_outlier_cols if col in col_pos]
+        outlier_bounds = _outlier_bounds_iqr([contexts[col_pos[col]].numeric()[0] for col in outlier_cols])
+        for col, (lower, upper) in zip(outlier_cols, outlier_bounds):
+            ctx = contexts[col_pos[col]]
+            values, parsed = ctx.numeric()
             if lower is None and upper is None:
                 continue
-            for row_index in range(len(df)):
-                val = df.iloc[row_index][col]
-                if _is_empty(val):
-                    continue
-                f = _to_float(val)
-                if f is None:
-                    continue
-                if (lower is not None and f < lower) or (upper is not None and f > upper):
-                    errors.append({
-                        "row_index": int(row_index),
-                        "col_name": col,
-                        "error_type": "outlier",
-                        "severity": "business",
-                        "message": f"数值 {val} 超出该列正常范围（异常值），建议确认",
-                    })
+            out_rows = np.flatnonzero(parsed & ~ctx.empty() & ((values < lower) | (values > upper)))
+            errs.add(
+                out_rows.tolist(), col, "outlier", "business",
+                _messages_by_value(
+                    ctx.series.to_numpy()[out_rows], lambda val: f"数值 {val} 超出该列正常范围（异常值），建议确认"
+                ),
+            )
 
         # ---- 5. 正则校验 ----
-        for col, pattern_str in self.pattern_columns.items():
-            if col not in df.columns:
-                continue
-            try:
-                pat = re.compile(pattern_str)
-            except re.error:
+        for col, pat in self._compiled_patterns.items():
+            if col not in col_pos:
                 continue
-            for row_index in range(len(df)):
-                val = df.iloc[row_index][col]
-                if _is_empty(val):
-                    continue
-                if not pat.search(str(val).strip()):
-                    errors.append({
-                        "row_index": int(row_index),
-                        "col_name": col,
-                        "error_type": "pattern_mismatch",
-                        "severity": "business",
-                        "message": f"格式不符合规则（预期匹配: {pattern_str[:30]}…）",
-                    })
+            ctx = contexts[col_pos[col]]
+            matched = _match_pattern(ctx.text(), pat)
+            errs.add(
+                np.flatnonzero(~ctx.empty() & ~matched).tolist(), col, "pattern_mismatch", "business",
+                f"格式不符合规则（预期匹配: {pat.pattern[:30]}…）",
+            )
 
         # ---- 6. 逻辑约束 ----
         for c in self.constraints:
             left_col = c.get("left")
             right_col = c.get("right")
             op = c.get("op", ">")
-            if not left_col or not right_col or left_col not in df.columns or right_col not in df.columns:
+            if not left_col or not right_col or left_col not in col_pos or right_col not in col_pos:
                 continue
-            for row_index in range(len(df)):
-                left_val = _to_float(df.iloc[row_index][left_col])
-                right_val = _to_float(df.iloc[row_index][right_col])
-                if not _eval_constraint(left_val, op, right_val):
-                    errors.append({
-                        "row_index": int(row_index),
-                        "col_name": f"{left_col} vs {right_col}",
-                        "error_type": "constraint_violation",
-                        "severity": "business",
-                        "message": f"列「{left_col}」应与「{right_col}」满足 {op} 关系",
-                    })
+            compare = _CONSTRAINT_UFUNCS.get(op)
+            if compare is None:
+                continue  # 未知运算符视为恒满足
+            left_vals, left_ok = contexts[col_pos[left_col]].numeric()
+            right_vals, right_ok = contexts[col_pos[right_col]].numeric()
+            # 任一侧无法解析为数值时视为满足；解析出 NaN（如 "nan%"）时比较为 False，记为违反
+            violated = left_ok & right_ok & ~compare(left_vals, right_vals)
+            errs.add(
+                np.flatnonzero(violated).tolist(), f"{left_col} vs {right_col}", "constraint_violation", "business",
+                f"列「{left_col}」应与「{right_col}」满足 {op} 关系",
+            )
+
+        errors = errs.to_dicts()
 
         # ---- 7. 汇总 ----
-        n_structural = sum(1 for e in errors if e.get("severity") == "structural")
-        n_business_null = sum(1 for e in errors if e.get("error_type") == "null_business")
-        n_type = sum(1 for e in errors if e.get("error_type") == "type_inconsistent")
-        n_dup = sum(1 for e in errors if e.get("error_type") == "duplicate")
-        n_outlier = sum(1 for e in errors if e.get("error_type") == "outlier")
-        n_pattern = sum(1 for e in errors if e.get("error_type") == "pattern_mismatch")
-        n_constraint = sum(1 for e in errors if e.get("error_type") == "constraint_violation")
+        type_counts = Counter(errs.error_types)
+        n_structural = Counter(errs.severities)["structural"]
+        n_business_null = type_counts["null_business"]
+        n_type = type_counts["type_inconsistent"]
+        n_dup = type_counts["duplicate"]
+        n_outlier = type_counts["outlier"]
+        n_pattern = type_counts["pattern_mismatch"]
+        n_constraint = type_counts["constraint_violation"]
         parts = []
         if n_structural > 0:
             parts.append(f"{n_structural} 处结构性空值（合并缺列）")
@@ -333,7 +482,7 @@ def scan_health(
     composite_key_columns: Optional[List[str]] = None,
     numeric_columns: Optional[List[str]] = None,
     outlier_columns: Optional[List[str]] = None,
-    pattern_columns: Optional[Dict[str, str]] = None,
+    pattern_columns: Optional[Dict[str, Union[str, Pattern[str]]]] = None,
     constraints: Optional[List[Dict[str, Any]]] = None,
 ) -> dict:
     """
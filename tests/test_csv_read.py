@@ -0,0 +1,73 @@
+"""
+CSV 读取回归测试：pyarrow 快速路径读出的表必须与 pd.read_csv(dtype=str) 完全一致。
+运行: python -m pytest -q tests
+"""
+
+import io
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+pytest.importorskip("pyarrow")
+
+import align_merge_engine  # noqa: E402
+from core.merger import (  # noqa: E402
+    _csv_header_fast,
+    _read_csv_as_str,
+    _read_csv_with_arrow,
+    analyze_headers_only_from_contents,
+)
+
+CASES = [
+    b"a,b\n1,2\n3,4\n",
+    b"a\n  \nx\n",
+    b"a,b\n1,2\n\t\n3,4\n",
+    b"a,b\r\n1,2\r\n \r\n3,4\r\n",
+    b"a,b\n1,2\n3,4\n  ",
+    b"a,b\r\n1,2\r3,4\r\n",
+    b"a,b\n 1,2\nNA,null\n",
+]
+
+
+def _expected(content: bytes) -> pd.DataFrame:
+    return pd.read_csv(io.BytesIO(content), encoding="utf-8-sig", dtype=str)
+
+
+@pytest.mark.parametrize("content", CASES)
+def test_read_csv_as_str_matches_pandas(content, tmp_path):
+    expected = _expected(content)
+    pd.testing.assert_frame_equal(_read_csv_as_str(content), expected, check_dtype=False)
+    path = tmp_path / "t.csv"
+    path.write_bytes(content)
+    pd.testing.assert_frame_equal(_read_csv_as_str(path), expected, check_dtype=False)
+    # pyarrow 路径要么与 pandas 一致，要么返回 None 交给 pandas
+    fast = _read_csv_with_arrow(path, None)
+    if fast is not None:
+        pd.testing.assert_frame_equal(fast, expected, check_dtype=False)
+
+
+def test_whitespace_only_line_is_skipped():
+    assert _read_csv_as_str(b"a\n  \nx\n")["a"].tolist() == ["x"]
+
+
+@pytest.mark.parametrize("content", CASES)
+def test_script_reader_matches_pandas(content, tmp_path):
+    path = tmp_path / "t.csv"
+    path.write_bytes(content)
+    pd.testing.assert_frame_equal(align_merge_engine._read_csv_as_str(path), _expected(content), check_dtype=False)
+
+
+@pytest.mark.parametrize("content", [b"  \na,b\n1,2\n", b"\t\r\na,b\n1,2\n", b"a,b\r1,2\n"])
+def test_header_skips_whitespace_only_first_line(content):
+    # 首行仅含空白时 pandas 跳过该行，快速路径不能把空白当作列名
+    assert _csv_header_fast(content) is None
+    assert list(_expected(content).columns) == ["a", "b"]
+    base = analyze_headers_only_from_contents([("t.csv", content), ("u.csv", b"a,b\n3,4\n")])
+    assert base["base_columns"] == ["a", "b"]
+    assert all(not f["missing_columns"] and not f["extra_columns"] for f in base["files"])
@@ -0,0 +1,52 @@
+"""
+主键左连接回归测试：匹配率只统计两表共有的非空主键，缺主键列的表不能被 NaN 主键“匹配”上。
+运行: python -m pytest -q tests
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from core.merger import MATCH_RATE_WARN_THRESHOLD, TableMerger  # noqa: E402
+
+
+def _merge(tmp_path, files, key_columns):
+    paths = []
+    for name, text in files:
+        path = tmp_path / name
+        path.write_bytes(text.encode("utf-8"))
+        paths.append(str(path))
+    return TableMerger().merge_and_report(paths, primary_key_columns=key_columns, template_incremental=True)
+
+
+def test_match_rate_counts_shared_keys(tmp_path):
+    df, report = _merge(
+        tmp_path,
+        [("a.csv", "学号,姓名\n1,张三\n2,李四\n"), ("b.csv", "学号,成绩\n2,90\n3,80\n")],
+        ["学号"],
+    )
+    assert report["tables"][1]["match_rate"] == 0.5
+    assert df["成绩"].tolist()[1] == "90"
+
+
+def test_missing_key_column_does_not_match_nan_keys(tmp_path):
+    # b.csv 没有主键列，对齐后主键全为 NaN；基准表的空主键不能算作匹配
+    _, report = _merge(
+        tmp_path,
+        [("a.csv", "学号,姓名\n,张三\n,李四\n1,王五\n"), ("b.csv", "姓名,成绩\n张三,90\n")],
+        ["学号"],
+    )
+    assert report["tables"][1]["match_rate"] == 0.0
+    assert report["merge_warning"] is not None
+
+
+def test_all_nan_keys_still_warn(tmp_path):
+    _, report = _merge(
+        tmp_path,
+        [("a.csv", "学号,姓名\n,张三\n"), ("b.csv", "姓名,成绩\n张三,90\n")],
+        ["学号"],
+    )
+    assert report["tables"][1]["match_rate"] < MATCH_RATE_WARN_THRESHOLD
+    assert report["merge_warning"] is not None
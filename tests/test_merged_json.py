@@ -0,0 +1,77 @@
+"""
+merge-and-scan 的 merged 输出回归测试：单列表、空表在 JSON / NDJSON 下都应正常返回。
+运行: python -m pytest -q tests
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import main  # noqa: E402
+from core.merger import build_merge_preview_from_contents  # noqa: E402
+from main import app, df_to_merged_json  # noqa: E402
+
+client = TestClient(app)
+
+
+def _post_csv(content: bytes, query: str = ""):
+    return client.post(
+        "/merge-and-scan" + query,
+        files=[("files", ("single.csv", content, "text/csv"))],
+    )
+
+
+def test_single_column_json():
+    resp = _post_csv("姓名\n张三\n\n李四\n".encode("utf-8"))
+    assert resp.status_code == 200
+    merged = resp.json()["merged"]
+    assert merged["columns"] == ["姓名"]
+    assert merged["rows"] == [{"姓名": "张三"}, {"姓名": "李四"}]
+
+
+def test_single_column_ndjson():
+    resp = _post_csv("姓名\n张三\n李四\n".encode("utf-8"), "?format=ndjson")
+    assert resp.status_code == 200
+    lines = [json.loads(line) for line in resp.text.splitlines() if line]
+    assert lines[0]["merged"] == {"columns": ["姓名"], "rows": []}
+    assert lines[1:] == [{"姓名": "张三"}, {"姓名": "李四"}]
+
+
+def test_single_column_with_null():
+    merged = df_to_merged_json(pd.DataFrame({"a": ["x", None]}))
+    assert merged == {"columns": ["a"], "rows": [{"a": "x"}, {"a": None}]}
+
+
+def test_single_column_preview():
+    preview = build_merge_preview_from_contents([("single.csv", "姓名\n张三\n".encode("utf-8"))])
+    assert preview == {"columns": ["姓名"], "rows": [{"姓名": "张三"}]}
+
+
+def test_empty_frame():
+    assert df_to_merged_json(pd.DataFrame()) == {"columns": [], "rows": []}
+    assert df_to_merged_json(pd.DataFrame(columns=["a", "b"])) == {"columns": ["a", "b"], "rows": []}
+
+
+def test_merge_without_data_returns_empty_merged(monkeypatch):
+    # 合并器报错且无数据时走「合并未产生数据」分支，返回无列的空 DataFrame
+    def fake_merge_and_report(self, paths, **kwargs):
+        return pd.DataFrame(), {"error": "基准表存在重复列名，无法合并", "merged_row_count": 0}
+
+    monkeypatch.setattr(main.TableMerger, "merge_and_report", fake_merge_and_report)
+
+    resp = _post_csv(b"a,b\n1,2\n")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["health_manifest"]["summary"] == "合并未产生数据"
+    assert body["merged"] == {"columns": [], "rows": []}
+
+    resp = _post_csv(b"a,b\n1,2\n", "?format=ndjson")
+    assert resp.status_code == 200
+    lines = [json.loads(line) for line in resp.text.splitlines() if line]
+    assert len(lines) == 1 and lines[0]["merged"] == {"columns": [], "rows": []}
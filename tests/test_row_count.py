@@ -0,0 +1,73 @@
+"""
+合并小结行数估算回归测试：快速路径给出的行数必须与 read_csv / read_excel 解析结果一致。
+运行: python -m pytest -q tests
+"""
+
+import io
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from core.merger import _read_excel, _row_count_from_content  # noqa: E402
+
+
+def _xlsx(rows, formatted_blank_rows=0):
+    openpyxl = pytest.importorskip("openpyxl")
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    for row in rows:
+        ws.append(row)
+    # 仅设置格式的空单元格会撑大工作表维度，但 read_excel 不会读出这些行
+    for k in range(formatted_blank_rows):
+        ws.cell(row=len(rows) + 1 + k, column=1).number_format = "0.00"
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        _xlsx([["a", "b"], [1, 2], [3, 4]]),
+        _xlsx([["a", "b"], [1, 2]], formatted_blank_rows=5),
+        _xlsx([["a", "b"], [1, 2], [None, None], [3, 4]]),
+        _xlsx([["a", "b"]]),
+    ],
+)
+def test_excel_row_count_matches_read_excel(content):
+    assert _row_count_from_content(content, "t.xlsx") == len(_read_excel(content, dtype=str))
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"a,b\n1,2\n3,4\n",
+        b"a,b\r\n1,2\r\n3,4\r\n",
+        b"a,b\n1,2\n  \n3,4\n",
+        b"a,b\r\n1,2\r\n\t\r\n3,4\r\n",
+        b" \na,b\n1,2\n",
+        b"a,b\n1,2\n3,4\n  ",
+        b"a,b\r\n1,2\r3,4\r\n",
+        b"a,b\n1,2\n3,4\r",
+        b"a,b\n 1,2\n",
+    ],
+)
+def test_csv_row_count_matches_read_csv(content, tmp_path):
+    expected = len(pd.read_csv(io.BytesIO(content), encoding="utf-8-sig", dtype=str))
+    assert _row_count_from_content(content, "t.csv") == expected
+    # 落盘路径走 mmap 分块计数
+    path = tmp_path / "t.csv"
+    path.write_bytes(content)
+    assert _row_count_from_content(path, "t.csv") == expected
+
+
+def test_xls_row_count_without_xlrd_falls_back_to_read_excel(monkeypatch):
+    # 未安装 xlrd 时维度快速路径不可用，应回退整表解析而不是记为 0
+    monkeypatch.setitem(sys.modules, "xlrd", None)
+    content = _xlsx([["a", "b"], [1, 2], [3, 4]])
+    assert _row_count_from_content(content, "t.xls") == 2
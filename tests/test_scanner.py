@@ -0,0 +1,144 @@
+"""
+健康扫描回归测试：固定一张小表上各类错误的内容、顺序与统计；大表走线程池准备列时结果与串行一致。
+运行: python -m pytest -q tests
+"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+import core.scanner as scanner  # noqa: E402
+from core.scanner import scan_health  # noqa: E402
+
+EMAIL_PATTERN = r"^[^@]+@[^@]+\.[a-z]+$"
+
+SCAN_KWARGS = dict(
+    composite_key_columns=["学号", "姓名"],
+    numeric_columns=["分数", "满分"],
+    outlier_columns=["分数"],
+    pattern_columns={"邮箱": EMAIL_PATTERN},
+    constraints=[{"left": "分数", "op": "<=", "right": "满分"}],
+)
+
+
+def _fixture(repeat: int = 1):
+    df = pd.DataFrame({
+        "学号": ["1", "2", "3", "3", "4", "5", "6", "7"],
+        "姓名": ["张三", "李四", "王五", "王五", " ", "赵六", "钱七", "孙八"],
+        "分数": ["85", "90", "abc", "88", "1000", "87", "50%", "86"],
+        "满分": ["100", "100", "100", "80", "100", "100", "100", "100"],
+        "邮箱": ["a@b.com", "x@y", "c@d.com", "c@d.com", np.nan, np.nan, np.nan, np.nan],
+    })
+    df = pd.concat([df] * repeat, ignore_index=True)
+    half = len(df) // 2
+    # 第二个源表缺「邮箱」列，合并时补空：后半部分的空邮箱为结构性空值
+    report = {
+        "tables": [
+            {"file": "a.csv", "row_count": half, "missing_columns": []},
+            {"file": "b.csv", "row_count": len(df) - half, "missing_columns": ["邮箱"]},
+        ]
+    }
+    return df, report
+
+
+def test_scan_errors_and_order():
+    df, report = _fixture()
+    manifest = scan_health(df, report, **SCAN_KWARGS)
+    errors = [(e["row_index"], e["col_name"], e["error_type"], e["severity"]) for e in manifest["errors"]]
+    assert errors == [
+        (4, "姓名", "null_business", "business"),
+        (4, "邮箱", "null_structural", "structural"),
+        (5, "邮箱", "null_structural", "structural"),
+        (6, "邮箱", "null_structural", "structural"),
+        (7, "邮箱", "null_structural", "structural"),
+        (2, "分数", "type_inconsistent", "business"),
+        (3, "学号,姓名", "duplicate", "business"),
+        (4, "分数", "outlier", "business"),
+        (6, "分数", "outlier", "business"),
+        (3, "满分", "outlier", "business"),
+        (1, "邮箱", "pattern_mismatch", "business"),
+        (3, "分数 vs 满分", "constraint_violation", "business"),
+        (4, "分数 vs 满分", "constraint_violation", "business"),
+    ]
+    messages = [e["message"] for e in manifest["errors"]]
+    assert messages[0] == "空值或空字符串"
+    assert messages[1] == "合并时该列在源表中缺失，已补空"
+    assert messages[5] == "期望数值，实际为: abc"
+    assert messages[6] == "与组合主键 ['学号', '姓名'] 重复"
+    assert messages[7] == "数值 1000 超出该列正常范围（异常值），建议确认"
+    assert messages[8] == "数值 50% 超出该列正常范围（异常值），建议确认"
+    assert messages[10] == f"格式不符合规则（预期匹配: {EMAIL_PATTERN}…）"
+    assert messages[11] == "列「分数」应与「满分」满足 <= 关系"
+
+
+def test_scan_counts_and_summary():
+    df, report = _fixture()
+    manifest = scan_health(df, report, **SCAN_KWARGS)
+    assert manifest["counts"] == {
+        "structural_nulls": 4,
+        "business_nulls": 1,
+        "type_errors": 1,
+        "duplicates": 1,
+        "outliers": 3,
+        "pattern_mismatch": 1,
+        "constraint_violation": 2,
+        "total": 13,
+    }
+    assert manifest["summary"] == (
+        "发现 4 处结构性空值（合并缺列），1 处业务空值，1 处类型不一致，1 处重复项，"
+        "3 处异常值，1 处格式不匹配，2 处逻辑约束违反"
+    )
+
+
+def test_scan_empty_frame():
+    manifest = scan_health(pd.DataFrame(columns=["学号", "分数"]), {"tables": []}, numeric_columns=["分数"])
+    assert manifest["errors"] == []
+    assert manifest["counts"]["total"] == 0
+
+
+def test_parallel_prepare_matches_serial(monkeypatch):
+    df, report = _fixture(repeat=5000)
+    assert df.shape[0] * df.shape[1] >= scanner._PARALLEL_MIN_CELLS
+
+    used = []
+
+    class SpyExecutor(ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            used.append(True)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(scanner, "ThreadPoolExecutor", SpyExecutor)
+    monkeypatch.setattr(scanner.os, "cpu_count", lambda: 4)
+    parallel = scan_health(df, report, **SCAN_KWARGS)
+    assert used, "线程池路径未执行"
+
+    monkeypatch.setattr(scanner, "_PARALLEL_MIN_CELLS", float("inf"))
+    used.clear()
+    serial = scan_health(df, report, **SCAN_KWARGS)
+    assert not used
+    assert parallel == serial
+    assert parallel["counts"] == {
+        "structural_nulls": 10000,
+        "business_nulls": 15000,
+        "type_errors": 5000,
+        "duplicates": 39993,
+        "outliers": 15000,
+        "pattern_mismatch": 5000,
+        "constraint_violation": 10000,
+        "total": 99993,
+    }
+
+
+@pytest.mark.parametrize("op, violated_rows", [(">", [0, 1, 5, 6, 7]), ("==", [0, 1, 3, 4, 5, 6, 7]), ("~", [])])
+def test_constraint_operators(op, violated_rows):
+    df, report = _fixture()
+    manifest = scan_health(df, report, constraints=[{"left": "分数", "op": op, "right": "满分"}])
+    rows = [e["row_index"] for e in manifest["errors"] if e["error_type"] == "constraint_violation"]
+    assert rows == violated_rows
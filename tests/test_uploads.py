@@ -0,0 +1,89 @@
+"""
+上传落盘回归测试：文件名不参与落盘路径，防止路径穿越与同名覆盖；报告中仍显示原始文件名。
+运行: python -m pytest -q tests
+"""
+
+import io
+import sys
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import main  # noqa: E402
+from main import _spool_uploads, app  # noqa: E402
+
+client = TestClient(app)
+
+
+def test_spool_uploads_ignores_client_paths(tmp_path):
+    dest = tmp_path / "spool"
+    dest.mkdir()
+    files = [
+        UploadFile(io.BytesIO(b"a\n1\n"), filename="../escape.csv"),
+        UploadFile(io.BytesIO(b"a\n2\n"), filename="same.csv"),
+        UploadFile(io.BytesIO(b"a\n3\n"), filename="same.csv"),
+    ]
+    entries = _spool_uploads(files, dest)
+    assert [name for name, _ in entries] == ["../escape.csv", "same.csv", "same.csv"]
+    assert not (tmp_path / "escape.csv").exists()
+    paths = [Path(p) for _, p in entries]
+    assert len(set(paths)) == 3
+    assert all(p.parent == dest for p in paths)
+    assert sorted(p.read_bytes() for p in paths) == [b"a\n1\n", b"a\n2\n", b"a\n3\n"]
+
+
+def test_merge_report_keeps_upload_names():
+    resp = client.post(
+        "/merge-and-scan",
+        files=[
+            ("files", ("班级B.csv", "姓名\n李四\n".encode("utf-8"), "text/csv")),
+            ("files", ("班级A.csv", "姓名\n张三\n".encode("utf-8"), "text/csv")),
+        ],
+    )
+    assert resp.status_code == 200
+    report = resp.json()["schema_report"]
+    assert report["reference_file"] == "班级A.csv"
+    assert [t["file"] for t in report["tables"]] == ["班级A.csv", "班级B.csv"]
+    assert resp.json()["merged"]["rows"] == [{"姓名": "张三"}, {"姓名": "李四"}]
+
+
+def test_cache_entry_added_after_header_analysis(monkeypatch):
+    # 表头分析期间条目尚未入缓存，不会被并发请求淘汰、删除临时目录
+    seen = []
+
+    def fake_analyze(file_entries):
+        seen.append((len(main._upload_cache), all(Path(p).exists() for _, p in file_entries)))
+        return {"base_columns": [], "files": []}
+
+    monkeypatch.setattr(main, "analyze_headers_with_strategy_from_contents", fake_analyze)
+    before = len(main._upload_cache)
+    resp = client.post("/analyze-headers", files=[("files", ("a.csv", b"a\n1\n", "text/csv"))])
+    assert resp.status_code == 200
+    assert seen == [(before, True)]
+    assert resp.json()["cache_key"] in main._upload_cache
+
+
+def test_cache_eviction_cleans_up_outside_lock(monkeypatch):
+    monkeypatch.setattr(main, "_upload_cache", OrderedDict())
+    monkeypatch.setattr(main, "_CACHE_MAX_ENTRIES", 2)
+    cleaned = []
+
+    class Dir(tempfile.TemporaryDirectory):
+        def cleanup(self):
+            cleaned.append(main._cache_lock._is_owned())
+            super().cleanup()
+
+    dirs = [Dir() for _ in range(3)]
+    for i, d in enumerate(dirs):
+        main._cache_upload(f"k{i}", (d, [], ""))
+    assert list(main._upload_cache) == ["k1", "k2"]
+    assert cleaned == [False]
+    assert not Path(dirs[0].name).exists()
+    for d in dirs[1:]:
+        d.cleanup()